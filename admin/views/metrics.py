@@ -0,0 +1,21 @@
+# admin/views/metrics.py
+from fastapi import APIRouter
+
+from core.chat_manager import chat_session_stats
+from core.translation_cache import translation_cache
+from core.redis import redis_pool_stats
+from core.response_cache import response_cache
+from db.base import pool_stats
+
+router = APIRouter()
+
+# /admin/* 이므로 admin_auth_middleware 로 보호된다
+@router.get("/admin/metrics")
+async def get_metrics():
+    return {
+        "chat_sessions": chat_session_stats(),
+        "translation_cache": translation_cache.stats(),
+        "db_pool": pool_stats(),
+        "redis_pool": redis_pool_stats(),
+        "response_cache": response_cache.stats(),
+    }
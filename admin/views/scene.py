@@ -1,5 +1,7 @@
 from sqladmin import ModelView
 from sqladmin.filters import ForeignKeyFilter
+
+from core.response_cache import response_cache
 from models.scene import Scene
 from models.story import Story
 
@@ -15,6 +17,7 @@ class SceneAdmin(ModelView, model=Scene):
         Scene.text,
         Scene.image_url,
         Scene.created_at,
+        Scene.updated_at,
     ]
 
     # 문자열이 아니라 ColumnFilter 객체로 교체
@@ -31,3 +34,10 @@ class SceneAdmin(ModelView, model=Scene):
 
     name        = "Scene"
     name_plural = "Scenes"
+
+    # 장면을 고치거나 지우면 그 스토리의 공개 응답 캐시(상세·공유·버전)와 원작 목록을 지운다
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        await response_cache.invalidate("originals", f"story:{model.story_id}")
+
+    async def after_model_delete(self, model, request) -> None:
+        await response_cache.invalidate("originals", f"story:{model.story_id}")
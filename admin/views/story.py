@@ -1,4 +1,6 @@
 from sqladmin import ModelView
+
+from core.response_cache import response_cache
 from models.story import Story
 from models.scene import Scene
 
@@ -54,3 +56,10 @@ class StoryAdmin(ModelView, model=Story):
 
     name = "Story"
     name_plural = "Stories"
+
+    # 관리 화면에서 원작을 만들거나 original 을 바꿔도 공개 응답 캐시에 바로 반영
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        await response_cache.invalidate("originals", f"story:{model.id}")
+
+    async def after_model_delete(self, model, request) -> None:
+        await response_cache.invalidate("originals", "shares", f"story:{model.id}")
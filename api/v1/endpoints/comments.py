@@ -1,11 +1,18 @@
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 
-from db.base import get_db
+from core.response_cache import response_cache, cache_key
+from core.story_counters import bump, COMMENTS
+from core.trending import record_event, COMMENT
+from db.base import get_db, get_async_db, run_in_own_session
 from models.comment import Comment
 from models.story import Story
-from models.user import User
 from schemas.comment import CommentCreate, CommentOut, CommentUpdate
 from typing import List
 from core.security import verify_token
@@ -13,55 +20,68 @@ from core.security import verify_token
 router = APIRouter()
 
 @router.post("/community/comment")
-def post_comment(
+async def post_comment(
     data: CommentCreate,
     user_id: str = Depends(verify_token),
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
 
     # 스토리 존재 여부 확인
-    story = db.query(Story).filter_by(id=data.story_id).first()
+    story = await db.get(Story, data.story_id)
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
     # 리뷰 생성
     comment = Comment(
         story_id=data.story_id,
-        user_id=user_id,
+        user_id=uuid.UUID(user_id),
         text=data.text,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
+    await bump(data.story_id, COMMENTS, 1)
+    await record_event(data.story_id, COMMENT)
+    await response_cache.invalidate(f"comments:{data.story_id}")
 
     return {"message": "리뷰이 성공적으로 등록되었습니다.", "comment_id": comment.id}
 
 @router.get("/community/comment/{story_id}", response_model=List[CommentOut])
-def get_comments(story_id: int, db: Session = Depends(get_db)):
-    story = db.query(Story).filter_by(id=story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+async def get_comments(story_id: int):
+    def _build(db: Session):
+        story = db.query(Story).filter_by(id=story_id).first()
+        if not story:
+            return None
+
+        comments = (
+            db.query(Comment)
+              .options(joinedload(Comment.user))
+              .filter_by(story_id=story_id)
+              .order_by(Comment.updated_at.asc())
+              .all()
+        )
 
-    comments = (
-        db.query(Comment)
-          .options(joinedload(Comment.user))
-          .filter_by(story_id=story_id)
-          .order_by(Comment.updated_at.asc())
-          .all()
+        return jsonable_encoder([
+            CommentOut(
+                id=comment.id,
+                story_id=comment.story_id,
+                user_nickname=comment.user.nickname,  # 닉네임이 뜨도록
+                text=comment.text,
+                created_at=comment.created_at,
+                updated_at=comment.updated_at
+            )
+            for comment in comments
+        ])
+
+    comments = await response_cache.get_or_build(
+        cache_key("comments", story_id=story_id),
+        lambda: run_in_threadpool(run_in_own_session, _build),
+        tags=(f"comments:{story_id}", f"story:{story_id}"),
     )
-
-    return [
-        CommentOut(
-            id=comment.id,
-            story_id=comment.story_id,
-            user_nickname=comment.user.nickname,  # 닉네임이 뜨도록
-            text=comment.text,
-            created_at=comment.created_at,
-            updated_at=comment.updated_at
-        )
-        for comment in comments
-    ]
+    if comments is None:
+        raise HTTPException(status_code=404, detail="Story not found")
+    return comments
 
 @router.put("/community/comment/{comment_id}")
 def update_comment(
@@ -83,6 +103,7 @@ def update_comment(
 
     db.commit()
     db.refresh(comment)
+    response_cache.invalidate_from_thread(f"comments:{comment.story_id}")
 
     return {
         "message": "리뷰가 수정되었습니다.",
@@ -90,20 +111,25 @@ def update_comment(
     }
 
 @router.delete("/community/comment/{comment_id}")
-def delete_comment(
+async def delete_comment(
     comment_id: int,
     user_id: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    comment = db.query(Comment).filter_by(id=comment_id).first()
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="리뷰를 찾을 수 없습니다.")
 
     if str(comment.user_id) != user_id:
         raise HTTPException(status_code=403, detail="삭제 권한이 없습니다")
 
-    db.delete(comment)
-    db.commit()
+    story_id = comment.story_id
+    created_at = comment.created_at
+    await db.delete(comment)
+    await db.commit()
+    await bump(story_id, COMMENTS, -1)
+    await record_event(story_id, COMMENT, sign=-1, at=created_at)
+    await response_cache.invalidate(f"comments:{story_id}")
 
     return {
         "message": "리뷰가 삭제되었습니다.",
@@ -1,51 +1,106 @@
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import List
 
-from db.base import get_db
+from db.base import get_db, get_async_db, run_in_own_async_session
 from core.security import verify_token
+from core.response_cache import response_cache, cache_key
+from core.trending import record_event, LIKE
+from core.story_counters import bump, get_counts, LIKES, COMMENTS
 from models.like import Like
-from models.story import Story
+from schemas.like import LikeBatchIn, LikeStatusOut
 
 router = APIRouter()
 
+
+def _violated_constraint(e: IntegrityError) -> str:
+    # asyncpg 예외는 SQLAlchemy 어댑터 예외의 __cause__ 에 constraint_name 으로 남는다
+    cause = getattr(e.orig, "__cause__", None)
+    return getattr(cause, "constraint_name", None) or str(e.orig)
+
+
+# /community/like/{story_id} 보다 먼저 등록해야 "batch" 가 story_id 로 잡히지 않는다
+@router.post("/community/like/batch", response_model=List[LikeStatusOut])
+async def batch_like_status(
+    data: LikeBatchIn,
+    user_id: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    피드 카드 여러 장의 좋아요 수·댓글 수·내 좋아요 여부를 한 번에 조회 (없는 스토리는 제외)
+    """
+    counts = await get_counts(db, data.story_ids, user_id=user_id)
+    return [
+        LikeStatusOut(
+            story_id=story_id,
+            likes=counts[story_id][LIKES],
+            comments=counts[story_id][COMMENTS],
+            liked=counts[story_id]["liked"],
+        )
+        for story_id in dict.fromkeys(data.story_ids)
+        if story_id in counts
+    ]
+
 @router.post("/community/like/{story_id}")
-def like_story(
+async def like_story(
     story_id: int,
     user_id: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # 스토리 존재 여부 확인
-    story = db.query(Story).filter_by(id=story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
-
-    # 이미 좋아요 했는지 확인
-    existing_like = db.query(Like).filter_by(user_id=user_id, story_id=story_id).first()
-    if existing_like:
+    # 좋아요 등록: (user_id, story_id) 유니크 인덱스로 한 문장에 중복 확인까지 처리
+    stmt = (
+        pg_insert(Like)
+        .values(user_id=uuid.UUID(user_id), story_id=story_id, created_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=[Like.user_id, Like.story_id])
+        .returning(Like.id)
+    )
+    try:
+        inserted = (await db.execute(stmt)).first()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        constraint = _violated_constraint(e)
+        if "likes_story_id_fkey" in constraint:
+            raise HTTPException(status_code=404, detail="Story not found")
+        if "likes_user_id_fkey" in constraint:
+            # 토큰은 유효하지만 탈퇴 등으로 사용자 행이 없는 경우
+            raise HTTPException(status_code=404, detail="User not found")
+        raise
+    if inserted is None:
         raise HTTPException(status_code=400, detail="이미 좋아요를 눌렀습니다")
-
-    # 좋아요 등록
-    like = Like(user_id=user_id, story_id=story_id, created_at=datetime.utcnow())
-    db.add(like)
-    db.commit()
+    await bump(story_id, LIKES, 1)
+    await record_event(story_id, LIKE)
+    await response_cache.invalidate(f"likes:{story_id}")
 
     return {
         "message": "좋아요가 등록되었습니다."
     }
 
 @router.delete("/community/like/{story_id}")
-def unlike_story(
+async def unlike_story(
     story_id: int,
     user_id: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    like = db.query(Like).filter_by(user_id=user_id, story_id=story_id).first()
-    if not like:
+    deleted = (await db.execute(
+        delete(Like)
+        .where(Like.user_id == uuid.UUID(user_id), Like.story_id == story_id)
+        .returning(Like.created_at)
+    )).first()
+    await db.commit()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="좋아요를 누른 적이 없습니다")
-
-    db.delete(like)
-    db.commit()
+    await bump(story_id, LIKES, -1)
+    # 좋아요를 누른 시각의 가중치만큼 뺀다
+    await record_event(story_id, LIKE, sign=-1, at=deleted.created_at)
+    await response_cache.invalidate(f"likes:{story_id}")
 
     return {
         "message": "좋아요가 삭제되었습니다."
@@ -53,8 +108,17 @@ def unlike_story(
 
 # 좋아요 개수 확인
 @router.get("/community/like/{story_id}")
-def count_likes(story_id: int, db: Session = Depends(get_db)):
-    count = db.query(Like).filter_by(story_id=story_id).count()
+async def count_likes(story_id: int):
+    # COUNT(*) 대신 stories.like_count + 아직 반영 안 된 증감분
+    async def _build(db: AsyncSession):
+        counts = await get_counts(db, [story_id])
+        return counts[story_id][LIKES] if story_id in counts else 0
+
+    count = await response_cache.get_or_build(
+        cache_key("like_count", story_id=story_id),
+        lambda: run_in_own_async_session(_build),
+        tags=(f"likes:{story_id}",),
+    )
 
     return {
         "story_id": story_id, 
@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import anyio.from_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime
 
+from core.config import get_settings
+from core.etag import make_etag, etag_matches, not_modified
+from core.response_cache import response_cache, cache_key
+from core.related import related_story_ids
 from core.security import verify_token
-from db.base import get_db
+from core.trending import record_event, remove_story, trending_story_ids, PUBLISH
+from crud.pagination import InvalidCursor
+from crud.share import share_crud, tag_filter, count_tags, TagMatch
+from db.base import get_db, run_in_own_session, run_in_own_async_session
 from models.story import Story
 from models.share import Share
-from schemas.share import ShareCreate, ShareOut, TagsUpdate
+from sevices.search import refresh_story_search
+from sevices.story import get_story_version_cached
+from schemas.share import ShareCreate, ShareOut, TagsUpdate, ShareFeedOut, ShareFeedItem, TagFacet, TrendingOut
 
+settings = get_settings()
 router = APIRouter()
 
+# 응답 캐시 태그: 공유 목록·태그 집계 전체
+SHARES_TAG = "shares"
+
 # 미리 지정된 태그 목록
 PREDEFINED_TAGS = ["어드벤쳐", "판타지", "미스터리", "과학", "호러"]
 
@@ -31,14 +46,34 @@ def get_predefined_tags():
     response_model=List[str],
     status_code=200
 )
-def get_database_tags(
-    db: Session = Depends(get_db)
-):
+async def get_database_tags():
     """
     DB에 저장된 모든 태그 조회 (중복 없이)
     """
-    rows = db.query(func.unnest(Share.tags).label("tag")).distinct().all()
-    return [row.tag for row in rows]
+    return [facet["tag"] for facet in await _tag_facets()]
+
+async def _tag_facets() -> List[dict]:
+    # 전체 shares 를 펼쳐 세는 쿼리라 캐시해 두고 공유·태그가 바뀌면 지운다
+    return await response_cache.get_or_build(
+        cache_key("tag_facets"),
+        lambda: run_in_own_async_session(count_tags),
+        tags=(SHARES_TAG,),
+        ttl_sec=settings.TAG_FACET_TTL_SEC,
+    )
+
+def _share_changed(story_id: int) -> None:
+    response_cache.invalidate_from_thread(SHARES_TAG, f"story:{story_id}")
+
+@router.get(
+    "/share/tags/facets",
+    response_model=List[TagFacet],
+    status_code=200
+)
+async def get_tag_facets():
+    """
+    태그별 공유 스토리 수 (많은 순)
+    """
+    return await _tag_facets()
 
 @router.get(
     "/share/stories/check/{story_id}",
@@ -91,8 +126,12 @@ def publish_story(
             created_at=datetime.utcnow()
         )
         db.add(share)
+    # 공유되면 검색 대상이 되므로 검색 문서를 최신 제목·장면으로 다시 만든다
+    refresh_story_search(db, story_id)
     db.commit()
     db.refresh(share)
+    _share_changed(story_id)
+    anyio.from_thread.run(record_event, story_id, PUBLISH)
     return share
 
 @router.patch(
@@ -121,6 +160,7 @@ def update_share_tags(
     share.tags = tags
     db.commit()
     db.refresh(share)
+    _share_changed(story_id)
     return share
 
 @router.post(
@@ -145,6 +185,7 @@ def add_tags_to_share(
     share.tags = list(dict.fromkeys(share.tags + new_tags))
     db.commit()
     db.refresh(share)
+    _share_changed(story_id)
     return share
 
 @router.delete(
@@ -168,6 +209,7 @@ def remove_tags_from_share(
     share.tags = [t for t in share.tags if t not in remove]
     db.commit()
     db.refresh(share)
+    _share_changed(story_id)
     return share
 
 @router.delete(
@@ -187,38 +229,130 @@ def unpublish_story(
         )
     db.delete(share)
     db.commit()
+    _share_changed(story_id)
+    anyio.from_thread.run(remove_story, story_id)
     return
 
 @router.get(
     "/shared/stories",
     response_model=List[ShareOut]
 )
-def list_shared_stories(
+async def list_shared_stories(
+    request: Request,
+    response: Response,
     tag: Optional[str] = Query(None, description="태그로 필터링"),
-    db: Session = Depends(get_db)
+    tags: List[str] = Query([], description="여러 태그로 필터링"),
+    match: TagMatch = Query("any", description="all: 모든 태그 포함, any: 하나라도 포함"),
 ):
-    query = db.query(Share).options(
-        joinedload(Share.story).joinedload(Story.scenes)
+    wanted = tags + [tag] if tag else tags
+
+    def _build(db: Session):
+        query = db.query(Share).options(
+            joinedload(Share.story).joinedload(Story.scenes)
+        )
+        if wanted:
+            query = query.filter(tag_filter(wanted, match))
+        body = jsonable_encoder([ShareOut.model_validate(share) for share in query.all()])
+        return {"etag": make_etag(body), "body": body}
+
+    # 캐시 적중 시 DB 세션을 열지 않는다. ETag 도 함께 캐시해 304 때 직렬화하지 않는다
+    cached = await response_cache.get_or_build(
+        cache_key("shared_stories", tags=sorted(set(wanted)), match=match),
+        lambda: run_in_threadpool(run_in_own_session, _build),
+        tags=(SHARES_TAG,),
+        tags_of=lambda page: [f"story:{share['story']['id']}" for share in page["body"]],
     )
-    if tag:
-        query = query.filter(Share.tags.any(tag))
-    shares = query.all()
-    return shares
+    if etag_matches(request, cached["etag"]):
+        return not_modified(cached["etag"])
+    response.headers["ETag"] = cached["etag"]
+    return cached["body"]
+
+@router.get(
+    "/shared/feed",
+    response_model=ShareFeedOut
+)
+def list_shared_feed(
+    tag: Optional[str] = Query(None, description="태그로 필터링"),
+    tags: List[str] = Query([], description="여러 태그로 필터링"),
+    match: TagMatch = Query("any", description="all: 모든 태그 포함, any: 하나라도 포함"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    db: Session = Depends(get_db)
+):
+    """
+    공유 스토리 피드 (요약). 제목·작성자·표지·태그·좋아요/댓글 수만 최신순으로 반환
+    """
+    try:
+        wanted = tags + [tag] if tag else tags
+        rows, next_cursor = share_crud.get_feed_page(db, limit=limit, cursor=cursor, tags=wanted, match=match)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+    return {"items": rows, "next_cursor": next_cursor}
+
+@router.get(
+    "/shared/trending",
+    response_model=TrendingOut
+)
+async def list_trending(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    인기 공유 스토리 (좋아요·댓글·최신성을 시간 감쇠해 합친 점수 순)
+    """
+    story_ids = await trending_story_ids(offset, limit)
+    rows = await run_in_threadpool(share_crud.get_feed_rows, db, story_ids)
+    next_offset = offset + limit if len(story_ids) == limit else None
+    return {"items": rows, "next_offset": next_offset}
 
 @router.get(
     "/shared/stories/{story_id}",
     response_model=ShareOut
 )
-def get_shared_story(
+async def get_shared_story(
     story_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
 ):
-    share = db.query(Share).options(
-        joinedload(Share.story).joinedload(Story.scenes)
-    ).filter_by(story_id=story_id).first()
-    if not share:
+    version = await get_story_version_cached(story_id)
+    if version is not None and etag_matches(request, version["etag"]):
+        return not_modified(version["etag"])
+
+    def _build(db: Session):
+        share = db.query(Share).options(
+            joinedload(Share.story).joinedload(Story.scenes)
+        ).filter_by(story_id=story_id).first()
+        return jsonable_encoder(ShareOut.model_validate(share)) if share else None
+
+    # 공유 전이면 None 이 캐시되지만 publish_story 가 story:{id} 를 지운다
+    share = await response_cache.get_or_build(
+        cache_key("shared_story", story_id=story_id),
+        lambda: run_in_threadpool(run_in_own_session, _build),
+        tags=(f"story:{story_id}",),
+    )
+    if not share or version is None:
         raise HTTPException(
             status_code=404,
             detail="Shared story not found"
         )
+    response.headers["ETag"] = version["etag"]
     return share
+
+@router.get(
+    "/shared/stories/{story_id}/related",
+    response_model=List[ShareFeedItem]
+)
+async def list_related_stories(
+    story_id: int,
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    태그·본문이 비슷한 공유 스토리 (미리 계산한 색인에서 조회)
+    """
+    story_ids = await related_story_ids(story_id, limit)
+    return await run_in_threadpool(share_crud.get_feed_rows, db, story_ids)
@@ -1,30 +1,92 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from starlette import status
 
 from core.chat_manager import new_session
+from core.etag import make_etag, etag_matches, not_modified
+from core.illust_queue import get_job
+from core.redis import get_meta
+from core.response_cache import response_cache, cache_key
 from core.security import verify_token, decode_token
-from schemas.story import StoryOut, StoriesOut, StoryOutWithDetail, StoriesOutWithDetail
-from sevices.story import create_new_story, get_all_story, check_story_auth, get_story_by_story_id
+from crud.pagination import InvalidCursor
+from db.base import get_async_db, run_in_own_session
+from schemas.story import StoryOut, StoriesOut, StoryOutWithDetail, StoriesOutWithDetail, StorySearchOut
+from sevices.search import search_stories
+from sevices.story import create_new_story, get_story_page, check_story_auth_async, get_story_by_story_id_async
 
 router = APIRouter()
 
 @router.get("/{story_id}/chat")
-async def init_chat(request: Request, story_id: int, user_id: str = Depends(verify_token)):
-    db = request.state.db
-    if not get_story_by_story_id(db, story_id).original and not check_story_auth(db, story_id, user_id):
+async def init_chat(story_id: int, user_id: str = Depends(verify_token), db: AsyncSession = Depends(get_async_db)):
+    story = await get_story_by_story_id_async(db, story_id)
+    if not (story and story.original) and not await check_story_auth_async(db, story_id, user_id):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     session_key = await new_session(user_id, story_id)
     return {"session_key": session_key}
 
+@router.get("/sessions/{session_key}/illustration")
+async def get_session_illustration(session_key: str, user_id: str = Depends(verify_token)):
+    # 세션 키는 "{user_id}:{story_id}:{hex}" 형식이라 앞부분으로 소유자를 확인한다
+    if session_key.split(":", 1)[0] != str(user_id):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    meta = await get_meta(session_key)
+    job = await get_job(meta["illust_job"]) if meta and meta.get("illust_job") else None
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Illustration job not found")
+    return job
+
 @router.get("/originals", response_model=StoriesOutWithDetail)
-def get_originals(request: Request):
-    db = request.state.db
-    stories = get_all_story(db)
-    resp = [story for story in stories if story.original]
-    return {"stories": resp}
+async def get_originals(
+        request: Request,
+        response: Response,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
+    def _build(db: Session):
+        stories, next_cursor = get_story_page(db, limit=limit, cursor=cursor, original=True, with_scenes=True)
+        body = jsonable_encoder(StoriesOutWithDetail(stories=stories, next_cursor=next_cursor))
+        return {"etag": make_etag(body), "body": body}
+
+    try:
+        cached = await response_cache.get_or_build(
+            cache_key("originals", limit=limit, cursor=cursor),
+            lambda: run_in_threadpool(run_in_own_session, _build),
+            tags=("originals",),
+            tags_of=lambda page: [f"story:{story['id']}" for story in page["body"]["stories"]],
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 cursor 입니다.")
+    if etag_matches(request, cached["etag"]):
+        return not_modified(cached["etag"])
+    response.headers["ETag"] = cached["etag"]
+    return cached["body"]
 
 @router.get("/", response_model=StoriesOut)
-def list_stories(request: Request):
+def list_stories(
+        request: Request,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
     db = request.state.db
-    stories = get_all_story(db)
-    return {"stories": stories}
+    try:
+        stories, next_cursor = get_story_page(db, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 cursor 입니다.")
+    return {"stories": stories, "next_cursor": next_cursor}
+
+@router.get("/search", response_model=StorySearchOut)
+async def search(
+        q: str = Query(..., min_length=1, max_length=100),
+        limit: int = Query(20, ge=1, le=50),
+        offset: int = Query(0, ge=0, le=1000),
+        db: AsyncSession = Depends(get_async_db),
+):
+    """원작·공유 스토리의 제목과 장면 본문 검색 (관련도 순)"""
+    rows = await search_stories(db, q, limit=limit + 1, offset=offset)
+    next_offset = offset + limit if len(rows) > limit else None
+    return {"stories": rows[:limit], "next_offset": next_offset}
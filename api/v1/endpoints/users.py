@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Request, Depends, Path, HTTPException, Body
+from typing import Optional
+
+import anyio.from_thread
+from fastapi import APIRouter, Request, Response, Depends, Path, HTTPException, Body, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from starlette import status
 
+from core.etag import etag_matches, not_modified
+from core.response_cache import response_cache
 from core.security import verify_token
+from core.trending import remove_story
+from crud.pagination import InvalidCursor
 from schemas.story import StoryOutWithDetail, StoriesOut
-from sevices.story import get_all_story, get_all_stories_by_user_id, create_new_story, get_story_by_story_id, \
-    delete_story_by_story_id, check_story_auth
+from sevices.story import get_story_page, create_new_story, get_story_by_story_id, \
+    delete_story_by_story_id, check_story_auth, get_story_version_cached
 
 router = APIRouter()
 
 @router.get("/me/stories",response_model=StoriesOut)
-def list_stories_by_user(request: Request,user_id: str = Depends(verify_token)):
+def list_stories_by_user(
+        request: Request,
+        user_id: str = Depends(verify_token),
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
     db = request.state.db
-    stories = get_all_stories_by_user_id(db,user_id)
-    return {"stories" : stories}
+    try:
+        stories, next_cursor = get_story_page(db, limit=limit, cursor=cursor, user_id=user_id)
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 cursor 입니다.")
+    return {"stories" : stories, "next_cursor": next_cursor}
 
 @router.post("/me/stories", response_model=StoryOutWithDetail)
 def init_story(request: Request, title: str = Body(..., embed=True), user_id: str = Depends(verify_token)):
@@ -21,15 +38,24 @@ def init_story(request: Request, title: str = Body(..., embed=True), user_id: st
     return story
 
 @router.get("/me/stories/{story_id}", response_model=StoryOutWithDetail)
-def get_story(story_id:int, request: Request, user_id: str = Depends(verify_token)):
+async def get_story(story_id:int, request: Request, response: Response, user_id: str = Depends(verify_token)):
     db = request.state.db
-    if not check_story_auth(db, story_id, user_id):
+    # 권한 확인과 ETag 를 스토리 본문 없이 버전 정보만으로 처리
+    version = await get_story_version_cached(story_id)
+    if version is None or version["user_id"] != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="해당 스토리에 접근할 권한이 없습니다."
         )
-    story = get_story_by_story_id(db, story_id)
-    return story
+    if etag_matches(request, version["etag"]):
+        return not_modified(version["etag"])
+
+    def _build():
+        story = get_story_by_story_id(db, story_id)
+        return jsonable_encoder(StoryOutWithDetail.model_validate(story))
+
+    response.headers["ETag"] = version["etag"]
+    return await run_in_threadpool(_build)
 
 @router.delete("/me/stories/{story_id}")
 def delete_story(story_id:int,request: Request, user_id: str = Depends(verify_token)):
@@ -39,6 +65,11 @@ def delete_story(story_id:int,request: Request, user_id: str = Depends(verify_to
             status_code=status.HTTP_403_FORBIDDEN,
             detail="해당 스토리에 접근할 권한이 없습니다."
         )
-    return delete_story_by_story_id(db, story_id)
+    deleted = delete_story_by_story_id(db, story_id)
+    response_cache.invalidate_from_thread(
+        f"story:{story_id}", f"comments:{story_id}", f"likes:{story_id}", "shares", "originals"
+    )
+    anyio.from_thread.run(remove_story, story_id)
+    return deleted
 
 
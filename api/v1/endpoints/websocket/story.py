@@ -1,9 +1,9 @@
 from __future__ import annotations
 from fastapi import APIRouter, WebSocket, Depends
 from fastapi.exceptions import WebSocketException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.base import get_db
+from db.base import get_async_db
 from sevices.storywebsocket import StorybookService
 from sevices.websocket import authenticate
 
@@ -13,7 +13,7 @@ router = APIRouter()
 async def storybook_ws(
     ws: WebSocket,
     session_key: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     service = StorybookService(session_key)
     ws.state.db = db
@@ -1,11 +1,21 @@
 import json
 import uuid
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 
 from google.generativeai import GenerativeModel, ChatSession, configure
 
 from core.config import get_settings
-from core.redis import rds, append_history, _meta, _hist, EXPIRE_SEC
+from core.fakes import FakeGenerativeModel
+from core.redis import (
+    rds,
+    flush_history,
+    finalize_history,
+    _meta,
+    _hist,
+    EXPIRE_SEC,
+)
+from core.session_cache import SessionCache
+from core.translation_cache import translation_cache
 
 settings = get_settings()
 configure(api_key=settings.GEMINI_API_KEY)
@@ -27,28 +37,47 @@ SYSTEM_PERSONA = """
 - 부적절한 응답을 하면 그냥 적당히 순화해서 알아들어줘
 """.strip()
 
-model = GenerativeModel(
-    settings.GEMINI_MODEL,
-    system_instruction=SYSTEM_PERSONA,
+if settings.FAKE_PROVIDERS:
+    model = FakeGenerativeModel()
+else:
+    model = GenerativeModel(
+        settings.GEMINI_MODEL,
+        system_instruction=SYSTEM_PERSONA,
+    )
+
+# 워커 메모리에 올라와 있는 Gemini 세션. 제거된 세션은 Redis history 로 복원한다.
+active_chat_sessions: SessionCache[ChatSession] = SessionCache(
+    max_items=settings.CHAT_SESSION_MAX,
+    idle_ttl=settings.CHAT_SESSION_IDLE_SEC,
+    max_bytes=settings.CHAT_SESSION_MAX_BYTES,
 )
 
-active_chat_sessions: Dict[str, ChatSession] = {}
-
-translate_model = GenerativeModel(
-    settings.GEMINI_MODEL,
-    system_instruction="""
+TRANSLATOR_PERSONA = """
     [역할]
     - 당신은 전문 번역가야.
     - 사용자가 입력한 한국어 문장을 정확한 영어로 번역해 줘.
     - 번역 외 다른 설명은 절대 하지 마.
     """.strip()
-)
-async def translate_to_english(text: str) -> str:
-    chat = translate_model.start_chat(history = [])
-    response = await chat.send_message_async(f"한국어 문장을 영어로 번역해줘: {text}")
+
+if settings.FAKE_PROVIDERS:
+    translate_model = FakeGenerativeModel()
+else:
+    translate_model = GenerativeModel(
+        settings.GEMINI_MODEL,
+        system_instruction=TRANSLATOR_PERSONA,
+    )
+
+
+async def _translate(text: str) -> str:
+    # 번역은 이전 대화가 필요 없으므로 채팅 세션 없이 단발 호출
+    response = await translate_model.generate_content_async(f"한국어 문장을 영어로 번역해줘: {text}")
     return response.text
 
 
+async def translate_to_english(text: str) -> str:
+    return await translation_cache.get_or_translate(text, _translate)
+
+
 async def new_session(user_id: str, story_id: Optional[int]) -> str:
     key = f"{user_id}:{story_id or 'tmp'}:{uuid.uuid4().hex[:8]}"
     meta = {"user_id": user_id, "story_id": story_id, "status": "draft"}
@@ -58,41 +87,64 @@ async def new_session(user_id: str, story_id: Optional[int]) -> str:
 
 
 async def mark_done(key: str) -> None:
-    if key in active_chat_sessions:
-        chat = active_chat_sessions[key]
+    chat = active_chat_sessions.pop(key)
+    entries = None
+    if chat is not None:
+        entries = [
+            ("U" if message.role == "user" else "AI", message.parts[0].text)
+            for message in chat.history
+        ]
+    await finalize_history(key, entries, status="done")
 
-        await rds.delete(_hist(key))
-        for message in chat.history:
-            role = "U" if message.role == "user" else "AI"
-            text = message.parts[0].text
-            await append_history(key, role, text)
 
-        del active_chat_sessions[key]
+async def _load_chat(session_key: str) -> ChatSession:
+    """캐시에 없으면 Redis history 로 Gemini 세션을 다시 만듭니다."""
+    chat = active_chat_sessions.get(session_key)
+    if chat is not None:
+        return chat
 
-    await rds.persist(_hist(key))
-    meta_raw = await rds.get(_meta(key))
-    if meta_raw:
-        meta = json.loads(meta_raw)
-        meta["status"] = "done"
-        await rds.set(_meta(key), json.dumps(meta))
-        await rds.persist(_meta(key))
+    # 버퍼에만 있는 history 까지 반영한 뒤 복원한다
+    await flush_history(session_key)
+    hist_raw: List[str] = await rds.lrange(_hist(session_key), 0, -1)
 
+    history_for_gemini = []
+    for entry in hist_raw:
+        role, text = entry.split(":", 1)
+        gemini_role = "user" if role == "U" else "model"
+        history_for_gemini.append({"role": gemini_role, "parts": [text]})
 
-async def send_message(session_key: str, user_text: str) -> str:
-    if session_key not in active_chat_sessions:
-        hist_raw: List[str] = await rds.lrange(_hist(session_key), 0, -1)
+    chat = model.start_chat(history=history_for_gemini)
+    active_chat_sessions.put(session_key, chat)
+    return chat
 
-        history_for_gemini = []
-        for entry in hist_raw:
-            role, text = entry.split(":", 1)
-            gemini_role = "user" if role == "U" else "model"
-            history_for_gemini.append({"role": gemini_role, "parts": [text]})
 
-        chat = model.start_chat(history=history_for_gemini)
-        active_chat_sessions[session_key] = chat
-    else:
-        chat = active_chat_sessions[session_key]
+async def send_message(session_key: str, user_text: str) -> str:
+    chat = await _load_chat(session_key)
 
     response = await chat.send_message_async(user_text)
+    active_chat_sessions.touch(session_key)
+
+    return response.text
+
+
+async def stream_message(session_key: str, user_text: str) -> AsyncIterator[str]:
+    """
+    send_message 의 스트리밍 버전.
+    모델이 생성하는 동안 지금까지 받은 전체 텍스트를 조각마다 돌려줍니다.
+    """
+    chat = await _load_chat(session_key)
+
+    response = await chat.send_message_async(user_text, stream=True)
+    text = ""
+    async for chunk in response:
+        try:
+            text += chunk.text
+        except ValueError:
+            # 텍스트가 없는 조각(안전 필터 등)은 건너뛴다
+            continue
+        yield text
+    active_chat_sessions.touch(session_key)
+
 
-    return response.text
\ No newline at end of file
+def chat_session_stats() -> Dict[str, int]:
+    return active_chat_sessions.stats()
\ No newline at end of file
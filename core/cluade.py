@@ -1,11 +1,52 @@
 # core/clova_utils.py
+import asyncio
+import json
 import uuid
-import requests
+from typing import Optional
+
+import aiohttp
 from core.config import get_settings
+from core.fakes import FakeProviderError, fake_clova_chat
 
 settings = get_settings()
 
-def send_clova_chat(
+CLOVA_CHAT_URL = "https://clovastudio.stream.ntruss.com/testapp/v3/chat-completions/HCX-005"
+
+# 워커 하나가 공유하는 keep-alive 세션과 동시 호출 제한
+_session: Optional[aiohttp.ClientSession] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.CLOVA_POOL_SIZE,
+            keepalive_timeout=settings.CLOVA_KEEPALIVE_SEC,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.CLOVA_TIMEOUT_SEC,
+            connect=settings.CLOVA_CONNECT_TIMEOUT_SEC,
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return _session
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.CLOVA_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def close_clova_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def send_clova_chat(
     text: str,
     temperature: float = 0.7,
     max_tokens: int = 1024,
@@ -16,6 +57,9 @@ def send_clova_chat(
     seed: int = 0,
     stop: list[str] | None = None,
 ) -> str:
+    if settings.FAKE_PROVIDERS:
+        return await fake_clova_chat(text)
+
     messages = [
         {
             "role": "system",
@@ -31,7 +75,7 @@ def send_clova_chat(
         "Content-Type": "application/json; charset=utf-8",
         "Accept": "application/json",
         "Authorization": f"Bearer {settings.NAVER_CLOVA_API_KEY}",
-        "X-NCP-CLOVASTUDIO-REQUEST-ID": "234416a647264cb29bf8e3d3b68cdc22",
+        "X-NCP-CLOVASTUDIO-REQUEST-ID": uuid.uuid4().hex,
     }
     payload = {
         "messages": messages,
@@ -45,13 +89,28 @@ def send_clova_chat(
         "stop": stop or []
     }
 
-    resp = requests.post("https://clovastudio.stream.ntruss.com/testapp/v3/chat-completions/HCX-005", headers=headers, json=payload)
-    resp.raise_for_status()
+    async with _get_semaphore():
+        async with _get_session().post(CLOVA_CHAT_URL, headers=headers, json=payload) as resp:
+            resp.raise_for_status()
+            body = await resp.text()
 
     # API가 JSON으로 결과를 주는 경우
     try:
-        data = resp.json()
+        data = json.loads(body)
         return data["result"]["message"]["content"]
     except ValueError:
         # JSON이 아닐 경우, 원문 텍스트 리턴
-        return resp.text
\ No newline at end of file
+        return body
+
+
+async def refine_with_clova(text: str) -> str:
+    """
+    Clova 로 동화 본문을 다듬습니다.
+    시간 초과나 오류가 나면 다듬지 않은 원문을 그대로 돌려줍니다.
+    """
+    try:
+        refined = await send_clova_chat(text)
+    except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, TypeError, FakeProviderError) as e:
+        print("Clova 다듬기 실패, 원문 사용:", repr(e))
+        return text
+    return refined.strip() or text
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
@@ -16,14 +16,64 @@ class Settings(BaseSettings):
     NAVER_CLOVA_API_KEY: str = Field(..., description="클로바 API 키")
     OPENAI_API_KEY: str = Field(..., description="Dall e API 키")
     DATABASE_URL: str = Field(..., description="DB 연결 URL")
+    ASYNC_DATABASE_URL: str = Field("", description="비동기 DB 연결 URL (비우면 DATABASE_URL 을 asyncpg 로 변환)")
+
+    # DB 커넥션 풀 (동기/비동기 엔진 각각에 적용)
+    DB_POOL_SIZE: int = Field(5, description="유지할 커넥션 수")
+    DB_MAX_OVERFLOW: int = Field(10, description="pool_size 를 넘어 추가로 열 수 있는 커넥션 수")
+    DB_POOL_TIMEOUT_SEC: float = Field(30.0, description="커넥션을 기다리는 최대 시간(초)")
+    DB_POOL_RECYCLE_SEC: int = Field(30 * 60, description="이 시간보다 오래된 커넥션은 다시 연결")
+
+    # 좋아요·댓글 수 (Redis 증감분 → stories 컬럼)
+    COUNTER_FLUSH_IN_APP: bool = Field(True, description="API 프로세스에서 증감분 반영 루프 실행")
+    COUNTER_FLUSH_SEC: float = Field(5.0, description="증감분을 DB 에 반영하는 주기(초)")
+    COUNTER_RECONCILE_SEC: int = Field(60 * 60, description="실제 행 수로 다시 맞추는 주기(초)")
+    TAG_FACET_TTL_SEC: int = Field(60, description="태그별 공유 수 캐시 유지 시간(초)")
+
+    # 인기 피드 (Redis sorted set)
+    TRENDING_IN_APP: bool = Field(True, description="API 프로세스에서 주기적 전체 재계산 실행")
+    TRENDING_RECOMPUTE_SEC: int = Field(60 * 60, description="전체 재계산 주기(초)")
+    TRENDING_HALF_LIFE_HOURS: float = Field(24.0, description="점수 반감기(시간)")
+    TRENDING_PUBLISH_WEIGHT: float = Field(3.0, description="공개 가중치")
+    TRENDING_LIKE_WEIGHT: float = Field(1.0, description="좋아요 가중치")
+    TRENDING_COMMENT_WEIGHT: float = Field(2.0, description="댓글 가중치")
+
+    # 관련 스토리 색인
+    RELATED_IN_APP: bool = Field(False, description="API 프로세스에서 주기적 색인 재계산 실행 (기본은 python -m core.related --loop 워커)")
+    RELATED_REBUILD_SEC: int = Field(6 * 60 * 60, description="색인 재계산 주기(초)")
+    RELATED_TOP_K: int = Field(20, description="스토리마다 저장할 관련 스토리 수")
+    RELATED_TAG_WEIGHT: float = Field(1.0, description="태그 유사도 비중")
+    RELATED_TEXT_WEIGHT: float = Field(1.0, description="제목·장면 본문 유사도 비중")
+    RELATED_MAX_DF_RATIO: float = Field(0.3, description="이 비율보다 많은 스토리에 나오는 태그·본문 용어는 제외")
+    RELATED_MAX_TERMS: int = Field(64, description="스토리마다 남길 본문 용어 수")
+
+    # 공개 GET 응답 캐시
+    RESPONSE_CACHE_TTL_SEC: int = Field(5 * 60, description="Redis 응답 캐시 유지 시간(초)")
+    RESPONSE_CACHE_L1_TTL_SEC: float = Field(2.0, description="프로세스 내 캐시 유지 시간(초), 다른 프로세스의 무효화가 늦게 보이는 최대 시간")
+    RESPONSE_CACHE_L1_SIZE: int = Field(1024, description="프로세스 내 캐시 항목 수")
+    RESPONSE_CACHE_LOCK_MS: int = Field(3000, description="만료 직후 한 프로세스만 새로 만들도록 잡는 락 시간(ms)")
 
     SECRET_KEY: str = Field(..., description="JWT 시크릿 키")
     ALGORITHM: str = Field(..., description="JWT 알고리즘")
     EXPIRE_TIME: int = 60  # 분 단위
 
     GEMINI_MODEL: str = "gemini-2.0-flash"
+    TRANSLATION_CACHE_SIZE: int = Field(2048, description="프로세스 내 번역 캐시 항목 수")
+    TRANSLATION_CACHE_TTL_SEC: int = Field(7 * 24 * 60 * 60, description="Redis 번역 캐시 보관 시간")
     NAVER_CLOVA_API_URL: str = Field(..., description="클로바 API url")
     REDIS_URL: str = Field(..., description="Redis 연결 URL")
+    REDIS_MAX_CONNECTIONS: int = Field(200, description="Redis 풀 최대 커넥션 수 (pub/sub 구독·BLMOVE 워커도 하나씩 점유)")
+    REDIS_POOL_TIMEOUT_SEC: float = Field(5.0, description="Redis 커넥션을 기다리는 최대 시간(초)")
+    REDIS_SOCKET_TIMEOUT_SEC: Optional[float] = Field(None, description="Redis 명령 응답 타임아웃(초). 구독·BLMOVE 가 끊기지 않도록 기본은 무제한")
+    REDIS_CONNECT_TIMEOUT_SEC: float = Field(2.0, description="Redis 연결 타임아웃(초)")
+    REDIS_HEALTH_CHECK_SEC: int = Field(30, description="유휴 커넥션 상태 확인 주기(초)")
+
+    # 클로바 호출
+    CLOVA_TIMEOUT_SEC: float = Field(8.0, description="클로바 요청 전체 타임아웃(초)")
+    CLOVA_CONNECT_TIMEOUT_SEC: float = Field(2.0, description="클로바 연결 타임아웃(초)")
+    CLOVA_MAX_CONCURRENCY: int = Field(16, description="워커당 클로바 동시 요청 수")
+    CLOVA_POOL_SIZE: int = Field(32, description="클로바 keep-alive 커넥션 풀 크기")
+    CLOVA_KEEPALIVE_SEC: float = Field(30.0, description="유휴 커넥션 유지 시간(초)")
 
     # OAuth 관련
     GOOGLE_CLIENT_ID: str = Field(..., description="OAuth google 클라이언트")
@@ -37,7 +87,39 @@ class Settings(BaseSettings):
     ADMIN_USERNAME: str = Field(..., description="관리자 ID")
     ADMIN_PASSWORD: str = Field(..., description="관리자 PW")
     
-    USING_DALL : bool = Field(..., description="dall 사용 여부")
+    USING_DALL : bool = Field(..., description="dall 사용 여부 (선호 제공자, 장애 시 자동 전환)")
+
+    # 삽화 생성 작업 큐
+    ILLUST_WORKER_ENABLED: bool = Field(False, description="별도 워커 프로세스로 삽화 생성 (False 면 API 프로세스에서 실행)")
+    ILLUST_WORKER_CONCURRENCY: int = Field(4, description="워커 프로세스당 동시 처리 작업 수")
+    ILLUST_JOB_TTL_SEC: int = Field(60 * 60, description="작업 상태/결과 보관 시간")
+    ILLUST_JOB_TIMEOUT_SEC: int = Field(3 * 60, description="처리 중인 작업의 heartbeat 가 이 시간 넘게 없으면 다시 큐에 넣음")
+    ILLUST_REQUEUE_SEC: int = Field(60, description="워커가 멈춘 작업을 확인하는 주기(초)")
+    ILLUST_MAX_ATTEMPTS: int = Field(3, description="2장을 모을 때까지 최대 요청 횟수")
+    ILLUST_RETRY_BASE_SEC: float = Field(0.5, description="재시도 백오프 시작 값(초)")
+    ILLUST_RETRY_MAX_SEC: float = Field(4.0, description="재시도 백오프 상한(초)")
+    ILLUST_DEADLINE_SEC: float = Field(90.0, description="이미지 생성 전체 제한 시간(초, 제공자 전환 포함). ILLUST_WAIT_TIMEOUT_SEC 보다 짧아야 함")
+    IMAGE_ROUTER_BREAKER_THRESHOLD: int = Field(3, description="연속 실패 몇 번이면 제공자 차단")
+    IMAGE_ROUTER_BREAKER_RESET_SEC: float = Field(30.0, description="차단 후 시험 요청까지 대기(초)")
+    IMAGE_ROUTER_FAILOVER_RESERVE_SEC: float = Field(20.0, description="앞 제공자가 실패했을 때 다음 제공자마다 남겨 둘 시간(초)")
+    IMAGE_ROUTER_EWMA_ALPHA: float = Field(0.2, description="제공자 지연 이동평균 가중치")
+    ILLUST_WAIT_TIMEOUT_SEC: int = Field(2 * 60, description="소켓에서 삽화 완료를 기다리는 최대 시간")
+
+    # 채팅 세션 캐시 (워커당)
+    CHAT_SESSION_MAX: int = Field(500, description="메모리에 유지할 최대 채팅 세션 수")
+    CHAT_SESSION_IDLE_SEC: int = Field(10 * 60, description="이 시간 동안 사용하지 않은 세션은 제거")
+    CHAT_SESSION_MAX_BYTES: int = Field(64 * 1024 * 1024, description="세션 history 총 크기 상한")
+
+    # 부하 테스트용 가짜 제공자 (외부 API 호출 없음)
+    FAKE_PROVIDERS: bool = Field(False, description="Gemini/DALL·E/클로바 대신 가짜 제공자 사용")
+    FAKE_SEED: int = Field(0, description="가짜 제공자 난수 시드")
+    FAKE_LLM_LATENCY_MS: float = Field(800.0, description="가짜 LLM 응답 지연 중앙값(ms)")
+    FAKE_CLOVA_LATENCY_MS: float = Field(600.0, description="가짜 클로바 응답 지연 중앙값(ms)")
+    FAKE_IMAGE_LATENCY_MS: float = Field(6000.0, description="가짜 이미지 1장 생성 지연 중앙값(ms)")
+    FAKE_LATENCY_SIGMA: float = Field(0.35, description="지연 로그정규 분포의 sigma")
+    FAKE_ERROR_RATE: float = Field(0.0, description="가짜 호출 실패 확률 (0~1)")
+    FAKE_TOKENS_PER_SEC: float = Field(60.0, description="스트리밍 시 초당 토큰 수")
+    FAKE_QUESTIONS_PER_PHASE: int = Field(2, description="마커를 내기 전까지 던질 질문 수")
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,32 @@
+"""
+조건부 GET (ETag / If-None-Match).
+
+ETag 는 본문이 아니라 "버전"에서 만들기 때문에, 클라이언트가 가진 버전과 같으면
+본문을 불러오거나 직렬화하지 않고 304 로 끝낼 수 있습니다.
+"""
+import hashlib
+import json
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def make_etag(*parts: Any) -> str:
+    raw = json.dumps(parts, ensure_ascii=False, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match 비교는 약한 비교 (W/ 접두사 무시)
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import struct
+import zlib
+from typing import Awaitable, Callable, List, Optional
+
+from core.config import get_settings
+from core.fakes import FakeProviderError, fake_delay, maybe_fail
+from core.image_manager import _save_bytes, _translate_image_prompt, _fix_prompt_with_llm
+from core.image_retry import generate_with_retry
+
+settings = get_settings()
+
+
+def fake_png(seed: str, width: int = 64, height: int = 48) -> bytes:
+    """seed 로 색을 정한 단색 4:3 PNG"""
+    r, g, b = hashlib.sha256(seed.encode("utf-8")).digest()[:3]
+    row = b"\x00" + bytes((r, g, b)) * width
+    raw = row * height
+
+    def _chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(raw))
+        + _chunk(b"IEND", b"")
+    )
+
+
+async def _request_images(
+        prompt: str,
+        count: int,
+        on_image: Callable[[str], Awaitable[None]],
+) -> None:
+    async def _one(no: int) -> str:
+        await fake_delay(settings.FAKE_IMAGE_LATENCY_MS)
+        maybe_fail("image")
+        return _save_bytes(fake_png(f"{prompt}:{no}"))
+
+    tasks = [asyncio.create_task(_one(n)) for n in range(count)]
+    error = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                url = await next_done
+            except FakeProviderError as e:
+                error = e
+                continue
+            await on_image(url)
+    finally:
+        for task in tasks:
+            task.cancel()
+    if error is not None:
+        raise error
+
+
+async def fake_gen_two_images(
+        prompt: str,
+        max_retries: int = 3,
+        on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+        count: int = 2,
+        deadline: Optional[float] = None,
+) -> List[str]:
+    return await generate_with_retry(
+        prompt,
+        count=count,
+        request=_request_images,
+        translate=_translate_image_prompt,
+        fix_prompt=_fix_prompt_with_llm,
+        on_progress=on_progress,
+        max_attempts=max_retries,
+        deadline=deadline,
+    )
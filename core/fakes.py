@@ -0,0 +1,130 @@
+"""
+부하 테스트용 가짜 LLM / 클로바 제공자.
+
+FAKE_PROVIDERS=true 이면 Gemini·클로바 대신 이 모듈의 구현을 씁니다.
+외부 API 를 부르지 않고, 설정한 지연 분포·오류율·토큰 속도로
+QUESTION:/EXAMPLES: 형식 질문과 ILLUST_OK / SCENE_OK 마커를 결정적으로 만들어 냅니다.
+"""
+import asyncio
+import math
+import random
+import re
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from core.config import get_settings
+
+settings = get_settings()
+
+_rng = random.Random(settings.FAKE_SEED)
+_MARKER_RE = re.compile(r"\*\*([A-Z_]+_OK)\*\*")
+
+
+class FakeProviderError(RuntimeError):
+    """FAKE_ERROR_RATE 확률로 일부러 내는 오류"""
+
+
+async def fake_delay(median_ms: float) -> None:
+    """중앙값 median_ms, 퍼짐 FAKE_LATENCY_SIGMA 인 로그정규 분포만큼 기다립니다."""
+    if median_ms <= 0:
+        return
+    seconds = median_ms / 1000 * math.exp(_rng.gauss(0, settings.FAKE_LATENCY_SIGMA))
+    await asyncio.sleep(seconds)
+
+
+def maybe_fail(what: str) -> None:
+    if _rng.random() < settings.FAKE_ERROR_RATE:
+        raise FakeProviderError(f"fake {what} failure")
+
+
+def _content(role: str, text: str) -> SimpleNamespace:
+    return SimpleNamespace(role=role, parts=[SimpleNamespace(text=text)])
+
+
+def _question(no: int) -> str:
+    return (
+        f"QUESTION: {no}번째 질문이야. 어떤 모습이면 좋을까?\n"
+        "EXAMPLES:\n"
+        "- 밝은 숲속\n"
+        "- 반짝이는 바다\n"
+        "- 구름 위 성\n"
+        "- 작은 마을"
+    )
+
+
+class FakeResponse:
+    """send_message_async / generate_content_async 결과. stream=True 면 조각 단위로 순회됩니다."""
+
+    def __init__(self, text: str, stream: bool):
+        self.text = text
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        if not self._stream:
+            yield SimpleNamespace(text=self.text)
+            return
+        # 한 토큰을 대략 글자 4개로 보고 FAKE_TOKENS_PER_SEC 속도로 흘려보낸다
+        step = 16
+        delay = step / 4 / max(settings.FAKE_TOKENS_PER_SEC, 1)
+        for i in range(0, len(self.text), step):
+            await asyncio.sleep(delay)
+            yield SimpleNamespace(text=self.text[i:i + step])
+
+
+class FakeChatSession:
+    """google.generativeai.ChatSession 의 필요한 부분만 흉내 냅니다."""
+
+    def __init__(self, history: Optional[List[Dict[str, Any]]] = None):
+        self.history: List[SimpleNamespace] = [
+            _content(h["role"], h["parts"][0]) for h in (history or [])
+        ]
+        self._marker: Optional[str] = None
+        self._remaining = 0
+        self._asked = 0
+
+    def _reply(self, text: str) -> str:
+        found = _MARKER_RE.search(text)
+        if found:
+            # 새 단계 시작: 질문 몇 개 뒤에 마커를 낸다
+            self._marker = found.group(1)
+            self._remaining = settings.FAKE_QUESTIONS_PER_PHASE
+        elif "5줄" in text:
+            return "\n".join(f"{n}번째 줄의 동화 문장이야." for n in range(1, 6))
+        elif "맞았는지" in text:
+            return "정답이야! 이야기 속 친구가 그렇게 했기 때문이야."
+        elif text.startswith("다음 문장을"):
+            return "햇살 가득한 숲에서 친구들이 함께 웃고 있는 모습"
+
+        if self._marker and self._remaining <= 0:
+            marker, self._marker = self._marker, None
+            if marker == "ILLUST_OK":
+                return f"{marker}\n따뜻한 햇살이 비치는 숲속에서 작은 토끼가 친구들과 소풍을 즐기는 장면"
+            return marker
+        self._remaining -= 1
+        self._asked += 1
+        return _question(self._asked)
+
+    async def send_message_async(self, text: str, stream: bool = False) -> FakeResponse:
+        await fake_delay(settings.FAKE_LLM_LATENCY_MS)
+        maybe_fail("llm")
+        reply = self._reply(text)
+        self.history += [_content("user", text), _content("model", reply)]
+        return FakeResponse(reply, stream)
+
+
+class FakeGenerativeModel:
+    """google.generativeai.GenerativeModel 대용"""
+
+    def start_chat(self, history: Optional[List[Dict[str, Any]]] = None) -> FakeChatSession:
+        return FakeChatSession(history)
+
+    async def generate_content_async(self, text: str) -> FakeResponse:
+        await fake_delay(settings.FAKE_LLM_LATENCY_MS)
+        maybe_fail("llm")
+        return FakeResponse(f"[en] {text.strip()}", stream=False)
+
+
+async def fake_clova_chat(text: str) -> str:
+    await fake_delay(settings.FAKE_CLOVA_LATENCY_MS)
+    maybe_fail("clova")
+    return text
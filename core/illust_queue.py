@@ -0,0 +1,306 @@
+"""
+삽화 생성 작업 큐.
+
+API 워커는 작업을 Redis 에 넣고 job_id 만 들고 있으며,
+실제 이미지 생성·저장은 별도 워커 프로세스가 처리합니다.
+
+    python -m core.illust_queue --concurrency 4
+
+ILLUST_WORKER_ENABLED 가 꺼져 있으면 같은 작업을 API 프로세스 안에서 실행합니다.
+어느 쪽이든 상태와 결과는 Redis 의 작업 해시에 남으므로 소켓이 끊겨도 job_id 로 다시 조회할 수 있습니다.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.config import get_settings
+from core.image_router import image_router
+from core.redis import rds
+
+settings = get_settings()
+
+QUEUE_KEY = "illust:queue"
+PROCESSING_KEY = "illust:processing"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+EVENTS_PATTERN = "illust:job:*:events"
+IMAGES_PER_JOB = 2
+RECHECK_SEC = 5
+# 처리 중인 작업이 살아 있음을 알리는 주기 (ILLUST_JOB_TIMEOUT_SEC 보다 충분히 짧게)
+HEARTBEAT_SEC = 15
+
+# 이 프로세스를 구분하는 값. 자기가 발행한 이벤트를 pub/sub 으로 다시 받지 않기 위해 쓴다.
+INSTANCE_ID = uuid.uuid4().hex
+
+# 워커 없이 API 프로세스에서 돌리는 작업 (GC 되지 않도록 참조 유지)
+_local_tasks: Dict[str, asyncio.Task] = {}
+# job_id -> 이벤트를 기다리는 큐들
+_waiters: Dict[str, List[asyncio.Queue]] = {}
+_event_listener: Optional[asyncio.Task] = None
+# requeue_stale: heartbeat 가 아직 없는 처리 중 작업을 처음 본 시각
+_no_heartbeat_since: Dict[str, float] = {}
+
+
+def _job(job_id: str) -> str:
+    return f"illust:job:{job_id}"
+
+
+def _events(job_id: str) -> str:
+    return f"illust:job:{job_id}:events"
+
+
+def default_backend() -> str:
+    return "dall" if settings.USING_DALL else "gemini"
+
+
+# ───── 작업 등록 / 조회 ─────────────────────────────────────
+async def enqueue_illustration(prompt: str, backend: Optional[str] = None) -> str:
+    """작업 해시를 만들고 큐에 넣은 뒤 job_id 를 반환합니다."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.hset(_job(job_id), mapping={
+            "status": QUEUED,
+            "prompt": prompt,
+            "backend": backend or default_backend(),
+            "urls": "[]",
+            "error": "",
+            "attempts": 0,
+            "ready": 0,
+            "created_at": now,
+            "updated_at": now,
+        })
+        pipe.expire(_job(job_id), settings.ILLUST_JOB_TTL_SEC)
+        if settings.ILLUST_WORKER_ENABLED:
+            pipe.lpush(QUEUE_KEY, job_id)
+        await pipe.execute()
+
+    if not settings.ILLUST_WORKER_ENABLED:
+        task = asyncio.create_task(run_job(job_id))
+        _local_tasks[job_id] = task
+        task.add_done_callback(lambda _: _local_tasks.pop(job_id, None))
+    return job_id
+
+
+async def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    raw = await rds.hgetall(_job(job_id))
+    if not raw:
+        return None
+    return {
+        "job_id": job_id,
+        "status": raw.get("status", QUEUED),
+        "backend": raw.get("backend", ""),
+        "urls": json.loads(raw.get("urls") or "[]"),
+        "error": raw.get("error", ""),
+        "attempts": int(raw.get("attempts", 0)),
+        "ready": int(raw.get("ready", 0)),
+        "created_at": float(raw.get("created_at", 0)),
+        "updated_at": float(raw.get("updated_at", 0)),
+    }
+
+
+async def _set_status(job_id: str, status: str, **fields: Any) -> None:
+    await rds.hset(_job(job_id), mapping={"status": status, "updated_at": time.time(), **fields})
+    await _publish(job_id, {"status": status, "ready": int(fields.get("ready", 0))})
+
+
+# ───── 완료 알림 ─────────────────────────────────────────
+def _deliver(job_id: str, event: Dict[str, Any]) -> None:
+    for queue in _waiters.get(job_id, []):
+        queue.put_nowait(event)
+
+
+async def _publish(job_id: str, event: Dict[str, Any]) -> None:
+    """같은 프로세스의 대기자에게는 바로, 다른 프로세스에는 pub/sub 으로 알립니다."""
+    _deliver(job_id, event)
+    await rds.publish(_events(job_id), json.dumps({**event, "origin": INSTANCE_ID}))
+
+
+def ensure_event_listener() -> None:
+    """작업 이벤트 pub/sub 리스너 스타트 (프로세스당 커넥션 하나만)"""
+    global _event_listener
+    if _event_listener is not None and not _event_listener.done():
+        return
+
+    async def _listener():
+        pubsub = rds.pubsub()
+        await pubsub.psubscribe(EVENTS_PATTERN)
+        try:
+            async for msg in pubsub.listen():
+                if msg["type"] != "pmessage":
+                    continue
+                try:
+                    event = json.loads(msg["data"])
+                except json.JSONDecodeError:
+                    continue
+                if event.pop("origin", None) == INSTANCE_ID:
+                    continue
+                # illust:job:{job_id}:events
+                _deliver(msg["channel"].split(":")[2], event)
+        finally:
+            await pubsub.punsubscribe(EVENTS_PATTERN)
+
+    _event_listener = asyncio.create_task(_listener())
+
+
+async def wait_for_job(
+    job_id: str,
+    timeout: float,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    작업이 끝날 때(DONE/FAILED)까지 기다렸다가 작업 정보를 반환합니다.
+    이미지가 한 장씩 준비될 때마다 on_progress(준비된 장수)를 호출합니다.
+    timeout 안에 끝나지 않으면 끝나지 않은 상태 그대로의 작업 정보를 반환합니다.
+    """
+    if job_id not in _local_tasks:
+        ensure_event_listener()
+    queue: asyncio.Queue = asyncio.Queue()
+    _waiters.setdefault(job_id, []).append(queue)
+    try:
+        # 대기 등록 후에 조회해야 그 사이 이벤트를 놓치지 않는다
+        job = await get_job(job_id)
+        if job is None or job["status"] in (DONE, FAILED):
+            return job
+        ready = job["ready"]
+        if ready and on_progress:
+            await on_progress(ready)
+
+        async def _until_finished():
+            nonlocal ready
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), RECHECK_SEC)
+                except asyncio.TimeoutError:
+                    # 리스너가 구독을 마치기 전에 발행된 이벤트를 놓쳤을 수 있어 가끔 직접 확인
+                    event = await get_job(job_id) or {"status": FAILED, "ready": 0}
+                if event["status"] in (DONE, FAILED):
+                    return
+                if event["ready"] != ready:
+                    ready = event["ready"]
+                    if on_progress:
+                        await on_progress(ready)
+
+        try:
+            await asyncio.wait_for(_until_finished(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return await get_job(job_id)
+    finally:
+        _waiters[job_id].remove(queue)
+        if not _waiters[job_id]:
+            del _waiters[job_id]
+
+
+# ───── 작업 실행 ─────────────────────────────────────────
+async def run_job(job_id: str) -> List[str]:
+    raw = await rds.hgetall(_job(job_id))
+    if not raw:
+        return []
+
+    await rds.hincrby(_job(job_id), "attempts", 1)
+    now = time.time()
+    await _set_status(job_id, RUNNING, started_at=now, heartbeat_at=now, ready=0)
+
+    async def _progress(ready: int) -> None:
+        await _set_status(job_id, RUNNING, ready=ready)
+
+    async def _heartbeat() -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_SEC)
+            await rds.hset(_job(job_id), "heartbeat_at", time.time())
+
+    heartbeat = asyncio.create_task(_heartbeat())
+    # backend 는 선호 제공자일 뿐, 장애 시 라우터가 다른 제공자로 넘긴다
+    try:
+        urls, provider = await image_router.generate(
+            raw["prompt"],
+            preferred=raw.get("backend") or default_backend(),
+            on_progress=_progress,
+            count=IMAGES_PER_JOB,
+        )
+    except Exception as e:
+        await _set_status(job_id, FAILED, error=repr(e))
+        return []
+    finally:
+        heartbeat.cancel()
+
+    if not urls:
+        await _set_status(job_id, FAILED, error="no image generated")
+        return []
+    await _set_status(job_id, DONE, urls=json.dumps(urls), ready=len(urls), provider=provider)
+    return urls
+
+
+# ───── 워커 ─────────────────────────────────────────────
+async def requeue_stale() -> int:
+    """
+    처리 중 목록에서 heartbeat 가 ILLUST_JOB_TIMEOUT_SEC 넘게 끊긴 작업(워커가 죽은 경우)을 다시 큐에 넣습니다.
+    꺼낸 직후라 heartbeat 가 아직 없는 작업은 이 확인 루프가 처음 본 시각부터 잽니다.
+    이미 끝난 작업은 목록에서 빼기만 합니다.
+    """
+    now = time.time()
+    deadline = now - settings.ILLUST_JOB_TIMEOUT_SEC
+    moved = 0
+    in_processing = set()
+    for job_id in await rds.lrange(PROCESSING_KEY, 0, -1):
+        in_processing.add(job_id)
+        status, heartbeat_at = await rds.hmget(_job(job_id), "status", "heartbeat_at")
+        if status in (DONE, FAILED) or status is None:
+            await rds.lrem(PROCESSING_KEY, 1, job_id)
+            continue
+        last_seen = float(heartbeat_at) if heartbeat_at else _no_heartbeat_since.setdefault(job_id, now)
+        if last_seen > deadline:
+            continue
+        if await rds.lrem(PROCESSING_KEY, 1, job_id):
+            # 다음 워커가 꺼낸 직후 예전 heartbeat 로 다시 판단되지 않도록 지운다
+            await rds.hdel(_job(job_id), "heartbeat_at")
+            await rds.lpush(QUEUE_KEY, job_id)
+            await _set_status(job_id, QUEUED)
+            moved += 1
+    for job_id in list(_no_heartbeat_since):
+        if job_id not in in_processing:
+            del _no_heartbeat_since[job_id]
+    return moved
+
+
+async def _requeue_loop() -> None:
+    while True:
+        try:
+            moved = await requeue_stale()
+            if moved:
+                print(f"[illust-worker] 멈춘 작업 {moved}개를 다시 큐에 넣었습니다")
+        except Exception as e:
+            print("[illust-worker] 멈춘 작업 확인 실패:", repr(e))
+        await asyncio.sleep(settings.ILLUST_REQUEUE_SEC)
+
+
+async def _consume() -> None:
+    while True:
+        job_id = await rds.blmove(QUEUE_KEY, PROCESSING_KEY, timeout=5, src="RIGHT", dest="LEFT")
+        if job_id is None:
+            continue
+        try:
+            await run_job(job_id)
+        finally:
+            await rds.lrem(PROCESSING_KEY, 1, job_id)
+
+
+async def run_worker(concurrency: int) -> None:
+    print(f"[illust-worker] 시작 (동시 처리 {concurrency}개)")
+    # 시작할 때 한 번 + 주기적으로 다른 워커가 죽으며 남긴 작업을 되살린다
+    await asyncio.gather(_requeue_loop(), *(_consume() for _ in range(concurrency)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="삽화 생성 워커")
+    parser.add_argument("--concurrency", type=int, default=settings.ILLUST_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(run_worker(args.concurrency))
@@ -1,13 +1,14 @@
 import asyncio
 import pathlib
 import uuid
-from typing import List
+from typing import Awaitable, Callable, List, Optional
 
 from google import genai
 from google.genai import types
 
-from core.chat_manager import send_message, translate_to_english
+from core.chat_manager import send_message, active_chat_sessions
 from core.config import get_settings
+from core.image_retry import generate_with_retry, translate_image_prompt, PromptRejected
 
 MEDIA_DIR = pathlib.Path("static/illustrations")
 URL_PREFIX = "/static/illustrations/"
@@ -38,48 +39,82 @@ def _save_bytes(img_bytes: bytes, ext: str = ".png") -> str:
     return f"{URL_PREFIX}{name}"
 
 async def _fix_prompt_with_llm(prompt: str) -> str:
+    key = str(uuid.uuid4())
     try:
-        resp = await send_message(str(uuid.uuid4()), f"다음 문장을 아이에게 보여줄 동화 그림으로 만들기에 적합하도록, 폭력적/선정적이지 않고 긍정적인 표현으로 바꿔줘: {prompt}")
+        resp = await send_message(key, f"다음 문장을 아이에게 보여줄 동화 그림으로 만들기에 적합하도록, 폭력적/선정적이지 않고 긍정적인 표현으로 바꿔줘: {prompt}")
         return resp
     except Exception:
         return prompt
+    finally:
+        # 일회성 세션이므로 캐시에 남기지 않는다
+        active_chat_sessions.pop(key)
 
 
-async def gen_two_images(
-        prompt: str,
-        retry: int = 0,
-        max_retries: int = 3
-) -> List[str]:
-    if retry >= max_retries:
-        return []
+def _first_image(resp) -> Optional[bytes]:
+    # 안전 필터에 걸리면 후보나 content 가 비어서 온다
+    if not resp.candidates or not resp.candidates[0].content:
+        return None
+    for part in resp.candidates[0].content.parts or []:
+        if getattr(part, "inline_data", None) and getattr(part.inline_data, "data", None):
+            return part.inline_data.data
+    return None
+
 
-    re_prompt = f"\n[그려줘]\n{prompt}"
-    image_prompt = IMAGE_PROMPT_PREFIX + re_prompt
-    translated_prompt = await translate_to_english(image_prompt)
-    print("번역된 프롬프트:", translated_prompt)
+async def _request_images(
+        translated_prompt: str,
+        count: int,
+        on_image: Callable[[str], Awaitable[None]],
+) -> None:
     config = types.GenerateContentConfig(response_modalities=["Text", "Image"])
     tasks = [
-        client.aio.models.generate_content(
+        asyncio.create_task(client.aio.models.generate_content(
             model="gemini-2.0-flash-preview-image-generation",
             contents=translated_prompt,
             config=config
-        ) for _ in range(2)
+        )) for _ in range(count)
     ]
-    responses = await asyncio.gather(*tasks, return_exceptions=True)
-    urls, success_count = [], 0
-    for resp in responses:
-        if isinstance(resp, Exception):
-            continue
-        try:
-            for part in resp.candidates[0].content.parts:
-                if getattr(part, "inline_data", None) and getattr(part.inline_data, "data", None):
-                    urls.append(_save_bytes(part.inline_data.data))
-                    success_count += 1
-        except Exception:
-            pass
-
-    if success_count < 2 and retry < max_retries:
-        fixed = await _fix_prompt_with_llm(prompt)
-        return await gen_two_images(fixed, retry + 1, max_retries)
-
-    return urls
\ No newline at end of file
+    rejected, error = False, None
+    try:
+        # 먼저 끝난 이미지부터 저장한다
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                resp = await next_done
+                data = _first_image(resp)
+            except Exception as e:
+                error = e
+                continue
+            if data is None:
+                rejected = True
+                continue
+            await on_image(_save_bytes(data))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if rejected:
+        raise PromptRejected()
+    if error is not None:
+        raise error
+
+
+async def _translate_image_prompt(prompt: str) -> str:
+    return await translate_image_prompt(prompt, IMAGE_PROMPT_PREFIX)
+
+
+async def gen_two_images(
+        prompt: str,
+        max_retries: int = 3,
+        on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+        count: int = 2,
+        deadline: Optional[float] = None,
+) -> List[str]:
+    return await generate_with_retry(
+        prompt,
+        count=count,
+        request=_request_images,
+        translate=_translate_image_prompt,
+        fix_prompt=_fix_prompt_with_llm,
+        on_progress=on_progress,
+        max_attempts=max_retries,
+        deadline=deadline,
+    )
@@ -2,13 +2,13 @@
 import asyncio
 import pathlib
 import uuid
-from typing import List
+from typing import Awaitable, Callable, List, Optional
 
 import aiohttp
 import openai
 
-from core.chat_manager import send_message, translate_to_english
 from core.config import get_settings
+from core.image_retry import generate_with_retry, translate_image_prompt, PromptRejected
 
 # 저장 경로 및 URL 접두사 설정
 MEDIA_DIR = pathlib.Path("static/illustrations")
@@ -75,43 +75,56 @@ async def _download_and_save(session: aiohttp.ClientSession, url: str) -> str:
     except Exception:
         return ""
 
-async def gen_two_images_with_dall(
-    prompt: str,
-    retry: int = 0,
-    max_retries: int = 3
-) -> List[str]:
-    """
-    DALL·E 3로 이미지 2장을 생성합니다.
-    실패 시 _fix_prompt_with_llm으로 교정 후 재시도합니다.
-    """
-    if retry >= max_retries:
-        return []
-
-    # 원본 프롬프트에 그려달라는 지시 추가
-    re_prompt = f"\n[그려줘]\n{prompt}"
-    image_prompt = IMAGE_PROMPT_PREFIX + re_prompt
-    translated_prompt = await translate_to_english(image_prompt)
-    print("번역된 프롬프트:", translated_prompt)
-    urls: List[str] = []
+async def _request_images(
+    translated_prompt: str,
+    count: int,
+    on_image: Callable[[str], Awaitable[None]],
+) -> None:
     try:
-        # 이미지 2장 생성 요청
         response = await openai.Image.acreate(
             prompt=translated_prompt,
-            n=2,
+            n=count,
             size="1024x1024"  # DALL·E가 지원하는 사이즈 중 하나
         )
-        image_urls = [item["url"] for item in response["data"]]
+    except openai.error.InvalidRequestError as e:
+        # 콘텐츠 정책 위반 등 프롬프트 자체가 거부된 경우
+        raise PromptRejected(str(e)) from e
+    image_urls = [item["url"] for item in response["data"]]
 
-        # 병렬로 다운로드 및 저장
-        async with aiohttp.ClientSession() as session:
-            tasks = [_download_and_save(session, u) for u in image_urls]
-            urls = await asyncio.gather(*tasks)
-    except Exception:
-        pass
+    # 병렬로 다운로드 및 저장, 저장될 때마다 알림
+    async with aiohttp.ClientSession() as session:
+        tasks = [asyncio.create_task(_download_and_save(session, u)) for u in image_urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                await on_image(await next_done)
+        finally:
+            for task in tasks:
+                task.cancel()
 
-    # 생성된 이미지가 2장 미만이면 프롬프트 교정 후 재귀 호출
-    if len([u for u in urls if u]) < 2 and retry < max_retries:
-        fixed = await _fix_prompt_with_llm(prompt)
-        return await gen_two_images_with_dall(fixed, retry + 1, max_retries)
 
-    return urls
+async def _translate_image_prompt(prompt: str) -> str:
+    return await translate_image_prompt(prompt, IMAGE_PROMPT_PREFIX)
+
+
+async def gen_two_images_with_dall(
+    prompt: str,
+    max_retries: int = 3,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+    count: int = 2,
+    deadline: Optional[float] = None,
+) -> List[str]:
+    """
+    DALL·E 3로 이미지 count 장(기본 2장)을 생성합니다.
+    성공한 이미지는 유지하고 모자란 장수만 백오프 후 다시 요청하며,
+    프롬프트가 거부되면 _fix_prompt_with_llm으로 교정 후 재시도합니다.
+    """
+    return await generate_with_retry(
+        prompt,
+        count=count,
+        request=_request_images,
+        translate=_translate_image_prompt,
+        fix_prompt=_fix_prompt_with_llm,
+        on_progress=on_progress,
+        max_attempts=max_retries,
+        deadline=deadline,
+    )
@@ -0,0 +1,99 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, List, Optional
+
+from core.chat_manager import translate_to_english
+from core.config import get_settings
+
+settings = get_settings()
+
+# 제공자 프롬프트, 필요한 장수, 저장된 이미지 URL 콜백
+RequestFn = Callable[[str, int, Callable[[str], Awaitable[None]]], Awaitable[None]]
+
+
+class PromptRejected(Exception):
+    """제공자가 프롬프트 내용 때문에 이미지를 만들지 않은 경우 (재시도 전에 프롬프트 교정 필요)"""
+
+
+class TranslationError(Exception):
+    """프롬프트 번역·교정(LLM)이 실패한 경우. 이미지 제공자의 실패가 아니므로 라우터가 차단기에 세지 않는다"""
+
+    def __init__(self, cause: Exception, urls: List[str]):
+        super().__init__(repr(cause))
+        # 실패 전까지 모은 이미지
+        self.urls = urls
+
+
+async def translate_image_prompt(prompt: str, prefix: str) -> str:
+    # 고정 접두사는 캐시에서 바로 나오고, 장면 설명만 실제로 번역된다
+    prefix_en, scene_en = await asyncio.gather(
+        translate_to_english(prefix),
+        translate_to_english(f"[그려줘]\n{prompt}"),
+    )
+    translated_prompt = f"{prefix_en}\n{scene_en}"
+    print("번역된 프롬프트:", translated_prompt)
+    return translated_prompt
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """full jitter 지수 백오프: 0 ~ min(cap, base * 2^(attempt-1))"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+async def generate_with_retry(
+    prompt: str,
+    count: int,
+    request: RequestFn,
+    translate: Callable[[str], Awaitable[str]],
+    fix_prompt: Callable[[str], Awaitable[str]],
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+    max_attempts: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> List[str]:
+    """
+    이미지 count 장을 모을 때까지 재시도합니다.
+    - 이미 성공한 이미지는 남겨 두고 모자란 장수만 다시 요청
+    - 일시적 오류는 같은 프롬프트로 jitter 백오프 후 재시도
+    - 내용 거부(PromptRejected)일 때만 프롬프트를 교정하고 다시 번역
+    - 전체 deadline 을 넘기면 그때까지 모인 이미지만 반환
+    """
+    max_attempts = max_attempts or settings.ILLUST_MAX_ATTEMPTS
+    loop = asyncio.get_running_loop()
+    end = loop.time() + (deadline or settings.ILLUST_DEADLINE_SEC)
+    urls: List[str] = []
+
+    async def _on_image(url: str) -> None:
+        if url and len(urls) < count:
+            urls.append(url)
+            if on_progress:
+                await on_progress(len(urls))
+
+    try:
+        provider_prompt = await translate(prompt)
+    except Exception as e:
+        raise TranslationError(e, urls) from e
+    attempt = 0
+    while len(urls) < count and attempt < max_attempts:
+        attempt += 1
+        remaining = end - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            await asyncio.wait_for(request(provider_prompt, count - len(urls), _on_image), remaining)
+        except PromptRejected:
+            try:
+                prompt = await fix_prompt(prompt)
+                provider_prompt = await translate(prompt)
+            except Exception as e:
+                raise TranslationError(e, list(urls)) from e
+            continue
+        except asyncio.TimeoutError:
+            break
+        except Exception as e:
+            print(f"이미지 생성 실패 ({attempt}/{max_attempts}):", repr(e))
+
+        if len(urls) < count and attempt < max_attempts:
+            delay = backoff_delay(attempt, settings.ILLUST_RETRY_BASE_SEC, settings.ILLUST_RETRY_MAX_SEC)
+            await asyncio.sleep(min(delay, max(0.0, end - loop.time())))
+
+    return urls
@@ -0,0 +1,199 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.config import get_settings
+from core.fake_images import fake_gen_two_images
+from core.image_manager import gen_two_images
+from core.image_manager_dall import gen_two_images_with_dall
+from core.image_retry import TranslationError
+
+settings = get_settings()
+
+ProgressFn = Optional[Callable[[int], Awaitable[None]]]
+# 제공자가 deadline 을 지키지 못했을 때 끊기 전 여유 시간
+PROVIDER_GRACE_SEC = 5.0
+# prompt, on_progress, count, deadline -> 저장된 이미지 URL 목록
+GenerateFn = Callable[..., Awaitable[List[str]]]
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold 번 쌓이면 열리고(open) reset_sec 동안 요청을 막습니다.
+    그 뒤 한 번만 시험 요청을 허용하고(half-open), 성공하면 닫힙니다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, reset_sec: float):
+        self.threshold = threshold
+        self.reset_sec = reset_sec
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+
+    def available(self) -> bool:
+        """상태를 바꾸지 않고 지금 시도할 수 있는지만 본다 (후보 고르기용)"""
+        return self.state == self.CLOSED or time.monotonic() - self.opened_at >= self.reset_sec
+
+    def allow(self) -> bool:
+        """실제로 요청하기 직전에 부른다. 열린 상태면 reset_sec 이 지난 뒤 한 요청에만 시험을 허용"""
+        if self.state == self.CLOSED:
+            return True
+        # 시험 요청이 결과 없이 끝나도(취소 등) reset_sec 마다 다시 기회를 준다
+        if time.monotonic() - self.opened_at >= self.reset_sec:
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class ImageProvider:
+    name: str
+    generate: GenerateFn
+    breaker: CircuitBreaker
+    latency_ewma: Optional[float] = None
+    successes: int = 0
+    failures: int = 0
+    last_error: str = ""
+
+    def record(self, ok: bool, elapsed: float, error: str = "") -> None:
+        if ok:
+            self.successes += 1
+            self.breaker.record_success()
+        else:
+            self.failures += 1
+            self.last_error = error
+            self.breaker.record_failure()
+        # 실패도 걸린 시간만큼 느린 것으로 반영
+        alpha = settings.IMAGE_ROUTER_EWMA_ALPHA
+        if self.latency_ewma is None:
+            self.latency_ewma = elapsed
+        else:
+            self.latency_ewma = alpha * elapsed + (1 - alpha) * self.latency_ewma
+
+
+@dataclass
+class ImageRouter:
+    """
+    이미지 제공자들 사이의 라우터.
+    차단기가 닫힌 제공자 중 선호 제공자를 먼저, 나머지는 평균 지연이 짧은 순으로 시도하고
+    실패하면 다음 제공자로 넘어갑니다.
+    전체 시간은 ILLUST_DEADLINE_SEC 이고, 제공자는 뒤에 남은 제공자마다
+    IMAGE_ROUTER_FAILOVER_RESERVE_SEC 만큼만 남기고 나머지를 모두 씁니다.
+    앞 제공자가 만든 이미지는 버리지 않고, 다음 제공자에는 모자란 장수만 요청합니다.
+    """
+
+    providers: Dict[str, ImageProvider] = field(default_factory=dict)
+
+    def register(self, name: str, generate: GenerateFn) -> None:
+        self.providers[name] = ImageProvider(
+            name=name,
+            generate=generate,
+            breaker=CircuitBreaker(
+                settings.IMAGE_ROUTER_BREAKER_THRESHOLD,
+                settings.IMAGE_ROUTER_BREAKER_RESET_SEC,
+            ),
+        )
+
+    def ordered(self, preferred: Optional[str] = None) -> List[ImageProvider]:
+        def _key(p: ImageProvider):
+            return (p.name != preferred, p.latency_ewma if p.latency_ewma is not None else 0.0)
+
+        return sorted(self.providers.values(), key=_key)
+
+    async def generate(
+        self,
+        prompt: str,
+        preferred: Optional[str] = None,
+        on_progress: ProgressFn = None,
+        count: int = 2,
+    ) -> tuple[List[str], str]:
+        """(이미지 URL 목록, 마지막으로 쓴 제공자 이름). 모두 실패하면 그때까지 모은 이미지를 반환합니다."""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + settings.ILLUST_DEADLINE_SEC
+        collected: List[str] = []
+        last_name = ""
+        providers = [p for p in self.ordered(preferred) if p.breaker.available()]
+        forced = not providers
+        if forced:
+            # 모두 차단된 상태면 빈 결과 대신 선호 제공자에 한 번은 맡겨 본다
+            providers = self.ordered(preferred)[:1]
+        for i, provider in enumerate(providers):
+            remaining = end - loop.time()
+            if remaining <= 0:
+                break
+            # 다른 요청이 이미 시험 요청을 보낸 half-open 제공자는 건너뛴다
+            if not provider.breaker.allow() and not forced:
+                continue
+            # 대부분은 첫 제공자가 성공하므로 전환용 여유만 남기고 다 준다 (너무 짧아지면 균등 분배)
+            later = len(providers) - i - 1
+            budget = max(remaining - later * settings.IMAGE_ROUTER_FAILOVER_RESERVE_SEC, remaining / (later + 1))
+            have = len(collected)
+
+            async def _progress(ready: int, have: int = have) -> None:
+                if on_progress:
+                    await on_progress(have + ready)
+
+            started = time.monotonic()
+            try:
+                # 제공자는 budget 안에 모은 만큼 돌려준다. wait_for 는 그래도 안 끝날 때의 안전장치
+                urls = await asyncio.wait_for(
+                    provider.generate(prompt, on_progress=_progress, count=count - have, deadline=budget),
+                    budget + PROVIDER_GRACE_SEC,
+                )
+            except TranslationError as e:
+                # 번역·교정 LLM 실패는 제공자 탓이 아니므로 차단기·지연에 반영하지 않는다
+                collected.extend([u for u in e.urls if u][:count - have])
+                if e.urls:
+                    last_name = provider.name
+                print(f"[image-router] {provider.name} 프롬프트 번역 실패, 다음 제공자로 전환:", repr(e))
+                if len(collected) >= count:
+                    return collected, last_name
+                continue
+            except Exception as e:
+                provider.record(False, time.monotonic() - started, repr(e))
+                print(f"[image-router] {provider.name} 실패, 다음 제공자로 전환:", repr(e))
+                continue
+
+            urls = [u for u in urls if u][:count - have]
+            if urls:
+                collected.extend(urls)
+                last_name = provider.name
+            if len(collected) >= count:
+                provider.record(True, time.monotonic() - started)
+                return collected, provider.name
+            provider.record(False, time.monotonic() - started, f"{len(urls)}/{count - have} images")
+        return collected, last_name
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            p.name: {
+                "state": p.breaker.state,
+                "latency_ewma": p.latency_ewma,
+                "successes": p.successes,
+                "failures": p.failures,
+                "last_error": p.last_error,
+            }
+            for p in self.providers.values()
+        }
+
+
+image_router = ImageRouter()
+if settings.FAKE_PROVIDERS:
+    image_router.register("fake", fake_gen_two_images)
+else:
+    image_router.register("gemini", gen_two_images)
+    image_router.register("dall", gen_two_images_with_dall)
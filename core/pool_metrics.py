@@ -0,0 +1,39 @@
+import time
+from typing import Dict
+
+
+class PoolMetrics:
+    """커넥션 풀 하나의 체크아웃 대기 시간·오버플로·타임아웃·pre-ping 실패를 모읍니다."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_waits = 0          # 10ms 넘게 기다린 체크아웃
+        self.overflow_events = 0     # pool_size 를 넘어 새 커넥션을 연 횟수
+        self.timeouts = 0            # 대기 시간 초과로 실패한 체크아웃
+        self.pre_ping_failures = 0   # 꺼낸 커넥션이 죽어 있어서 교체한 횟수
+
+    def wait_started(self) -> float:
+        return time.perf_counter()
+
+    def wait_finished(self, started: float) -> None:
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+        if waited > 0.01:
+            self.slow_waits += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "slow_waits": self.slow_waits,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "pre_ping_failures": self.pre_ping_failures,
+        }
@@ -4,7 +4,8 @@ from time import sleep
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.params import Depends
 import json
-from typing import Any, Set, List, Dict, Optional
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Set, List, Dict, Optional, Tuple
 
 # 기존 redis.py 또는 core/redis.py 파일의 내용
 # --------------------------------------------------------------------------
@@ -12,11 +13,51 @@ from typing import Any, Set, List, Dict, Optional
 # 이 예제에서는 설명을 위해 필요한 변수들을 직접 정의합니다.
 
 from core.config import get_settings
+from core.pool_metrics import PoolMetrics
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
 import asyncio
 
 settings = get_settings()
-rds = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+class TimedRedisPool(redis.BlockingConnectionPool):
+    """
+    커넥션이 모두 사용 중이면 REDIS_POOL_TIMEOUT_SEC 까지 기다리는 풀.
+    (기본 ConnectionPool 은 max_connections 를 넘으면 곧바로 오류를 낸다)
+    """
+
+    metrics = PoolMetrics("redis")
+
+    async def get_connection(self, *args, **kwargs):
+        started = self.metrics.wait_started()
+        try:
+            conn = await super().get_connection(*args, **kwargs)
+        except RedisConnectionError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.wait_finished(started)
+        return conn
+
+
+redis_pool = TimedRedisPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    timeout=settings.REDIS_POOL_TIMEOUT_SEC,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SEC,
+    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SEC,
+    health_check_interval=settings.REDIS_HEALTH_CHECK_SEC,
+)
+rds = redis.Redis(connection_pool=redis_pool)
+
+
+def redis_pool_stats() -> dict:
+    return {
+        **TimedRedisPool.metrics.snapshot(),
+        "in_use": len(getattr(redis_pool, "_in_use_connections", ())),
+        "max_connections": redis_pool.max_connections,
+    }
 EXPIRE_SEC = 30 * 60
 ROOMS_KEY = "rooms"
 LOCAL_PEERS: dict[str, Set[WebSocket]] = {}
@@ -128,11 +169,169 @@ def _hist(k: str) -> str:
     return f"chat:{k}:hist"
 
 
-async def append_history(key: str, sender: str, text: str) -> None:
+# 세션 meta(JSON)의 일부 필드만 바꾼다. 만료 시간은 그대로 둔다
+# KEYS[1]=meta / ARGV[1]=바꿀 필드(JSON, null 이면 삭제)
+_UPDATE_META_LUA = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return 0
+end
+local meta = cjson.decode(raw)
+for k, v in pairs(cjson.decode(ARGV[1])) do
+    if v == cjson.null then
+        meta[k] = nil
+    else
+        meta[k] = v
+    end
+end
+redis.call('SET', KEYS[1], cjson.encode(meta), 'KEEPTTL')
+return 1
+"""
+_update_meta_script = rds.register_script(_UPDATE_META_LUA)
+
+
+async def get_meta(key: str) -> Optional[Dict[str, Any]]:
+    raw = await rds.get(_meta(key))
+    return json.loads(raw) if raw else None
+
+
+async def update_meta(key: str, **fields: Any) -> bool:
+    """세션 meta 에 필드를 더하거나(None 이면 지움) 바꾼다. 세션이 없으면 False."""
+    return bool(await _update_meta_script(keys=[_meta(key)], args=[json.dumps(fields, ensure_ascii=False)]))
+
+
+def _hist_entry(sender: str, text: str) -> str:
     prefix = "U" if sender == "U" else "AI"
-    await rds.rpush(_hist(key), f"{prefix}:{text}")
-    await rds.expire(_hist(key), EXPIRE_SEC)
-    await rds.expire(_meta(key), EXPIRE_SEC)
+    return f"{prefix}:{text}"
+
+
+class HistoryWriter:
+    """
+    채팅 history 를 세션별로 모아 두었다가 한 번의 파이프라인으로 기록합니다.
+    RPUSH + EXPIRE(hist) + EXPIRE(meta) 를 호출마다 보내던 왕복을 flush 당 1회로 줄입니다.
+    같은 세션의 flush 는 세션별 락으로 한 번에 하나씩만 돌아 기록 순서가 뒤바뀌지 않습니다.
+    """
+
+    def __init__(self, max_pending: int = 32):
+        self.max_pending = max_pending
+        self._pending: Dict[str, List[str]] = {}
+        # key -> [락, 사용 중인 수]. 아무도 안 쓰면 지워서 끝난 세션의 락이 쌓이지 않게 한다
+        self._locks: Dict[str, List[Any]] = {}
+        # 버퍼가 차서 띄운 flush (GC 되지 않도록 참조 유지)
+        self._tasks: Set[asyncio.Task] = set()
+
+    def add(self, key: str, sender: str, text: str) -> bool:
+        """버퍼에 추가하고, 바로 flush 해야 할 만큼 쌓였는지 반환합니다."""
+        entries = self._pending.setdefault(key, [])
+        entries.append(_hist_entry(sender, text))
+        return len(entries) >= self.max_pending
+
+    def pending(self, key: str) -> int:
+        return len(self._pending.get(key, []))
+
+    def take(self, key: str) -> List[str]:
+        """버퍼에 남은 항목을 기록하지 않고 꺼냅니다. (locked(key) 안에서 호출)"""
+        return self._pending.pop(key, [])
+
+    @asynccontextmanager
+    async def locked(self, key: str):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def flush_soon(self, key: str) -> None:
+        task = asyncio.create_task(self.flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._flushed)
+
+    def _flushed(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print("[history] flush 실패:", repr(task.exception()))
+
+    async def flush(self, key: Optional[str] = None) -> None:
+        keys = [key] if key is not None else sorted(self._pending)
+        async with AsyncExitStack() as stack:
+            # 여러 세션을 한 번에 flush 할 때는 정해진 순서로 락을 잡아 교착을 피한다
+            for k in keys:
+                await stack.enter_async_context(self.locked(k))
+            # 락을 잡은 뒤에 꺼내야 먼저 꺼낸 항목이 먼저 기록된다
+            batches = [(k, self._pending.pop(k)) for k in keys if self._pending.get(k)]
+            if not batches:
+                return
+            async with rds.pipeline(transaction=False) as pipe:
+                for k, entries in batches:
+                    pipe.rpush(_hist(k), *entries)
+                    pipe.expire(_hist(k), EXPIRE_SEC)
+                    pipe.expire(_meta(k), EXPIRE_SEC)
+                await pipe.execute()
+
+
+history_writer = HistoryWriter()
+
+
+def queue_history(key: str, sender: str, text: str) -> None:
+    """history 를 버퍼에만 쌓습니다. 기록은 flush_history 에서 한 번에 합니다."""
+    if history_writer.add(key, sender, text):
+        history_writer.flush_soon(key)
+
+
+async def flush_history(key: Optional[str] = None) -> None:
+    await history_writer.flush(key)
+
+
+async def append_history(key: str, sender: str, text: str) -> None:
+    history_writer.add(key, sender, text)
+    await history_writer.flush(key)
+
+
+# 세션 종료 시 history 정리 + persist + meta 상태 변경을 한 번에 처리
+# KEYS[1]=hist, KEYS[2]=meta / ARGV[1]=status, ARGV[2]=교체 여부('1'), ARGV[3..]=entries
+_FINALIZE_HISTORY_LUA = """
+if ARGV[2] == '1' then
+    redis.call('DEL', KEYS[1])
+end
+for i = 3, #ARGV do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+end
+redis.call('PERSIST', KEYS[1])
+local raw = redis.call('GET', KEYS[2])
+if raw then
+    local meta = cjson.decode(raw)
+    meta['status'] = ARGV[1]
+    redis.call('SET', KEYS[2], cjson.encode(meta))
+end
+return redis.call('LLEN', KEYS[1])
+"""
+_finalize_history_script = rds.register_script(_FINALIZE_HISTORY_LUA)
+
+
+async def finalize_history(
+    key: str,
+    entries: Optional[List[Tuple[str, str]]] = None,
+    status: str = "done",
+) -> None:
+    """
+    세션 history 를 영구 보존하고 meta 의 status 를 바꿉니다. Redis 왕복 1회.
+    entries 가 주어지면 history 를 (sender, text) 목록으로 통째로 교체하고,
+    없으면 버퍼에 남은 항목만 덧붙입니다.
+    """
+    # 진행 중인 flush 가 끝난 뒤에 남은 항목을 붙여야 순서가 유지된다
+    async with history_writer.locked(key):
+        pending = history_writer.take(key)
+        if entries is None:
+            replace, values = "0", pending
+        else:
+            replace, values = "1", [_hist_entry(sender, text) for sender, text in entries]
+        await _finalize_history_script(keys=[_hist(key), _meta(key)], args=[status, replace, *values])
 
 
 async def get_room_details(room_code: str) -> Optional[Dict[str, Any]]:
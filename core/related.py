@@ -0,0 +1,194 @@
+"""
+관련 스토리 색인.
+
+공유된 스토리마다 태그 + 제목·장면 n-gram 으로 TF-IDF 희소 벡터를 만들고,
+역색인(용어 → 스토리)을 따라 내적을 누적해 코사인 유사도 상위 K 개를 미리 계산합니다.
+(희소 행렬 A·Aᵀ 를 행 단위로 계산하는 것과 같고, 겹치는 용어가 없는 쌍은 건드리지 않습니다)
+결과는 Redis 해시 related:index 에 story_id → "id,id,..." 로 저장해 조회는 HGET 한 번입니다.
+
+    python -m core.related          # 한 번 다시 계산
+    python -m core.related --loop   # 별도 워커로 주기적으로 다시 계산 (RELATED_IN_APP=False 일 때)
+
+계산은 순수 파이썬이라 GIL 을 잡고 있으므로 API 프로세스의 스레드가 아니라 자식 프로세스에서 돌립니다.
+"""
+import argparse
+import asyncio
+import heapq
+import math
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+
+from core.config import get_settings
+from core.redis import rds
+from db.base import AsyncSessionLocal
+from models.scene import Scene
+from models.share import Share
+from models.story import Story
+from sevices.search import ngrams
+
+settings = get_settings()
+
+INDEX_KEY = "related:index"
+LOCK_KEY = "related:lock"
+
+Vector = Dict[str, float]
+
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release = rds.register_script(_RELEASE_LUA)
+
+
+def _normalize(vec: Vector) -> Vector:
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    return {t: w / norm for t, w in vec.items()} if norm else {}
+
+
+def build_vectors(
+        tags: Dict[int, Iterable[str]],
+        texts: Dict[int, str],
+) -> Dict[int, Vector]:
+    """
+    story_id -> 단위 길이 희소 벡터. 태그 블록과 본문 블록을 각각 정규화한 뒤
+    RELATED_TAG_WEIGHT / RELATED_TEXT_WEIGHT 비율로 합친다.
+    본문 용어는 한 스토리에만 있거나(겹칠 수 없음) 너무 흔한 것(RELATED_MAX_DF_RATIO 초과)은 빼고,
+    태그도 너무 흔한 것은 뺀다 (모든 스토리에 붙은 태그는 후보를 전부 훑게 만든다).
+    """
+    ids = list(tags)
+    n = len(ids)
+    if not n:
+        return {}
+
+    tag_df = Counter(t for sid in ids for t in set(tags[sid]))
+    term_counts = {sid: Counter(ngrams(texts.get(sid, ""))) for sid in ids}
+    term_df = Counter(t for counts in term_counts.values() for t in counts)
+    max_df = max(2, int(n * settings.RELATED_MAX_DF_RATIO))
+
+    vectors: Dict[int, Vector] = {}
+    for sid in ids:
+        tag_vec = _normalize({
+            f"#{t}": math.log(1 + n / tag_df[t])
+            for t in set(tags[sid])
+            if tag_df[t] <= max_df
+        })
+        text_vec = {
+            t: (1 + math.log(c)) * math.log(n / term_df[t])
+            for t, c in term_counts[sid].items()
+            if 2 <= term_df[t] <= max_df
+        }
+        # 긴 스토리가 후보 계산을 독점하지 않도록 무게가 큰 용어만 남긴다
+        if len(text_vec) > settings.RELATED_MAX_TERMS:
+            text_vec = dict(heapq.nlargest(settings.RELATED_MAX_TERMS, text_vec.items(), key=lambda kv: kv[1]))
+        text_vec = _normalize(text_vec)
+
+        combined = {t: w * settings.RELATED_TAG_WEIGHT for t, w in tag_vec.items()}
+        combined.update({t: w * settings.RELATED_TEXT_WEIGHT for t, w in text_vec.items()})
+        vectors[sid] = _normalize(combined)
+    return vectors
+
+
+def top_k_neighbors(vectors: Dict[int, Vector], k: int) -> Dict[int, List[Tuple[int, float]]]:
+    """역색인으로 겹치는 용어가 있는 쌍만 내적을 누적해 스토리마다 유사도 상위 k 개"""
+    postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+    for sid, vec in vectors.items():
+        for term, w in vec.items():
+            postings[term].append((sid, w))
+
+    neighbors: Dict[int, List[Tuple[int, float]]] = {}
+    for sid, vec in vectors.items():
+        scores: Dict[int, float] = defaultdict(float)
+        for term, w in vec.items():
+            for other, ow in postings[term]:
+                if other != sid:
+                    scores[other] += w * ow
+        neighbors[sid] = heapq.nlargest(k, scores.items(), key=lambda kv: (kv[1], kv[0]))
+    return neighbors
+
+
+def _compute(tags: Dict[int, List[str]], texts: Dict[int, str], k: int) -> Dict[int, List[Tuple[int, float]]]:
+    # 자식 프로세스에서 실행되므로 모듈 최상위 함수여야 한다 (pickle)
+    return top_k_neighbors(build_vectors(tags, texts), k)
+
+
+async def _load_documents() -> Tuple[Dict[int, List[str]], Dict[int, str]]:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(Share.story_id, Share.tags, Story.title).join(Story, Story.id == Share.story_id)
+        )
+        tags: Dict[int, List[str]] = {}
+        texts: Dict[int, List[str]] = {}
+        for row in rows:
+            tags[row.story_id] = list(row.tags or [])
+            texts[row.story_id] = [row.title or ""]
+        scenes = await db.execute(
+            select(Scene.story_id, Scene.text)
+            .where(Scene.story_id.in_(select(Share.story_id)))
+            .order_by(Scene.story_id, Scene.order_idx, Scene.id)
+        )
+        for story_id, text in scenes:
+            texts[story_id].append(text or "")
+    return tags, {sid: "\n".join(parts) for sid, parts in texts.items()}
+
+
+async def rebuild_related() -> int:
+    """색인을 통째로 다시 만든다. 색인한 스토리 수를 반환 (다른 프로세스가 계산 중이면 0)"""
+    token = uuid.uuid4().hex
+    if not await rds.set(LOCK_KEY, token, nx=True, ex=30 * 60):
+        return 0
+    try:
+        tags, texts = await _load_documents()
+
+        # CPU 작업이 GIL 을 잡아 같은 프로세스의 요청 처리를 막지 않도록 자식 프로세스에서
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            neighbors = await loop.run_in_executor(pool, _compute, tags, texts, settings.RELATED_TOP_K)
+
+        tmp_key = f"{INDEX_KEY}:tmp:{token}"
+        mapping = {
+            str(sid): ",".join(str(other) for other, _ in found)
+            for sid, found in neighbors.items()
+            if found
+        }
+        async with rds.pipeline(transaction=True) as pipe:
+            if mapping:
+                pipe.hset(tmp_key, mapping=mapping)
+                pipe.rename(tmp_key, INDEX_KEY)
+            else:
+                pipe.delete(INDEX_KEY)
+            await pipe.execute()
+        return len(mapping)
+    finally:
+        await _release(keys=[LOCK_KEY], args=[token])
+
+
+async def related_story_ids(story_id: int, limit: int) -> List[int]:
+    found = await rds.hget(INDEX_KEY, str(story_id))
+    if not found:
+        return []
+    return [int(sid) for sid in found.split(",")[:limit]]
+
+
+async def run_related_rebuild() -> None:
+    while True:
+        try:
+            await rebuild_related()
+        except Exception as e:
+            print("[related] 색인 재계산 실패:", repr(e))
+        await asyncio.sleep(settings.RELATED_REBUILD_SEC)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="관련 스토리 색인")
+    parser.add_argument("--loop", action="store_true", help="RELATED_REBUILD_SEC 마다 계속 다시 계산")
+    args = parser.parse_args()
+    if args.loop:
+        asyncio.run(run_related_rebuild())
+    else:
+        print(f"[related] 색인한 스토리: {asyncio.run(rebuild_related())}")
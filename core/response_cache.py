@@ -0,0 +1,249 @@
+"""
+공개 GET 응답 캐시.
+
+프로세스 내 짧은 L1 → Redis(L2) → 실제 생성 순서로 찾고, 각 항목에 태그를 붙여
+쓰기 쪽에서 invalidate("story:12") 처럼 태그 단위로 지웁니다.
+
+만료 직후 같은 키 요청이 몰려도 DB 에는 한 번만 갑니다.
+  - 같은 프로세스: 진행 중인 생성(task)을 나눠 기다림. 먼저 온 요청이 끊겨도 생성은 계속됨
+  - 여러 프로세스: Redis 락을 잡은 쪽만 생성하고 나머지는 잠깐 L2 를 다시 봄
+
+무효화가 생성 도중에 끼어들면(생성이 쓰기 전 DB 를 읽음) 그 결과는 저장하지 않습니다.
+태그마다 마지막 무효화 시각(Redis TIME, rc:inv:{tag})을 남기고, 저장할 때 그 항목의 태그 중
+하나라도 생성 시작 뒤에 무효화됐으면 Lua 에서 SET 을 건너뜁니다.
+tags_of 로 생성 뒤에야 알게 되는 태그도 같은 방식으로 비교할 수 있어 세대 번호 대신 시각을 씁니다.
+다른 태그의 쓰기는 진행 중인 생성에 영향을 주지 않습니다.
+
+L1 은 다른 프로세스의 무효화를 모르므로 RESPONSE_CACHE_L1_TTL_SEC 만큼 늦을 수 있습니다.
+"""
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import anyio.from_thread
+
+from core.config import get_settings
+from core.redis import rds
+
+settings = get_settings()
+
+# KEYS = (태그 집합, 무효화 시각) 쌍 / ARGV[1] = 무효화 시각 보관 시간
+# 태그의 무효화 시각(µs)을 남기고, 태그 집합에 든 캐시 키와 태그 집합 자체를 한 번에 지운다
+_INVALIDATE_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000000 + t[2]
+local removed = 0
+for i = 1, #KEYS, 2 do
+    local tag = KEYS[i]
+    local members = redis.call('SMEMBERS', tag)
+    for _, key in ipairs(members) do
+        removed = removed + redis.call('DEL', key)
+    end
+    redis.call('DEL', tag)
+    redis.call('SET', KEYS[i + 1], string.format('%d', now), 'EX', ARGV[1])
+end
+return removed
+"""
+
+# KEYS[1] = 캐시 키, KEYS[2..] = (태그 집합, 무효화 시각) 쌍
+# ARGV = 생성 시작 시각(µs), 값, ttl. 그 뒤 무효화된 태그가 있으면 저장하지 않고 0
+_FILL_LUA = """
+local started = tonumber(ARGV[1])
+for i = 3, #KEYS, 2 do
+    local invalidated = tonumber(redis.call('GET', KEYS[i]) or '0')
+    if invalidated >= started then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+for i = 2, #KEYS, 2 do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    -- 항목보다 먼저 사라지지 않도록 마지막 추가 시점부터 ttl 만큼 유지
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def cache_key(name: str, **params: Any) -> str:
+    """라우트 이름 + 파라미터로 만든 키 (파라미터 순서와 무관)"""
+    raw = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{name}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]}"
+
+
+class ResponseCache:
+    def __init__(
+            self,
+            prefix: str,
+            ttl_sec: int,
+            l1_ttl_sec: float,
+            l1_size: int,
+            lock_ms: int,
+    ):
+        self.prefix = prefix
+        self.ttl_sec = ttl_sec
+        self.l1_ttl_sec = l1_ttl_sec
+        self.l1_size = l1_size
+        self.lock_ms = lock_ms
+        # key -> (만료 시각, 값, 태그)
+        self._l1: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._invalidate = rds.register_script(_INVALIDATE_LUA)
+        self._fill = rds.register_script(_FILL_LUA)
+        self._release = rds.register_script(_RELEASE_LUA)
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.lock_waits = 0
+        self.stale_skips = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _inv(self, tag: str) -> str:
+        return f"{self.prefix}:inv:{tag}"
+
+    def _tag_keys(self, tags: Iterable[str]) -> List[str]:
+        return [k for tag in tags for k in (self._tag(tag), self._inv(tag))]
+
+    def _remember(self, key: str, value: Any, tags: Tuple[str, ...]) -> None:
+        self._l1[key] = (time.monotonic() + self.l1_ttl_sec, value, tags)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_size:
+            self._l1.popitem(last=False)
+
+    async def get_or_build(
+            self,
+            key: str,
+            build: Callable[[], Awaitable[Any]],
+            tags: Iterable[str] = (),
+            tags_of: Optional[Callable[[Any], Iterable[str]]] = None,
+            ttl_sec: Optional[int] = None,
+    ) -> Any:
+        """
+        build 는 JSON 으로 직렬화할 수 있는 값(jsonable_encoder 결과 등)을 돌려줘야 한다.
+        tags_of 를 주면 만든 값에서 태그를 더 뽑는다 (목록에 든 스토리마다 story:{id} 등).
+        """
+        hit = self._l1.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            self._l1.move_to_end(key)
+            self.l1_hits += 1
+            return hit[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._build(key, tuple(tags), build, tags_of, ttl_sec or self.ttl_sec))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # 기다리던 요청이 취소돼도 생성 task 와 다른 대기자에게는 번지지 않는다
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 기다리던 요청이 모두 끊긴 뒤 실패해도 "never retrieved" 경고가 남지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    async def _build(self, key, tags, build, tags_of, ttl_sec) -> Any:
+        value, all_tags, fresh = await self._load(key, tags, build, tags_of, ttl_sec)
+        if fresh:
+            self._remember(key, value, all_tags)
+        return value
+
+    async def _load(self, key, tags, build, tags_of, ttl_sec) -> Tuple[Any, Tuple[str, ...], bool]:
+        """(값, 태그, 캐시에 넣어도 되는지)"""
+        redis_key = self._key(key)
+        cached = await rds.get(redis_key)
+        if cached is not None:
+            self.l2_hits += 1
+            entry = json.loads(cached)
+            return entry["v"], tuple(entry["t"]), True
+
+        lock_key = f"{redis_key}:lock"
+        token = uuid.uuid4().hex
+        locked = await rds.set(lock_key, token, nx=True, px=self.lock_ms)
+        if not locked:
+            # 다른 프로세스가 만드는 중: 그 결과를 잠깐 기다려 본다
+            self.lock_waits += 1
+            deadline = time.monotonic() + self.lock_ms / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                cached = await rds.get(redis_key)
+                if cached is not None:
+                    self.l2_hits += 1
+                    entry = json.loads(cached)
+                    return entry["v"], tuple(entry["t"]), True
+            # 락 주인이 죽었거나 너무 느리면 직접 만든다
+
+        try:
+            self.misses += 1
+            # DB 를 읽기 전의 Redis 시각을 잡아 둬야 그 뒤의 무효화를 알아챈다
+            sec, usec = await rds.time()
+            started = sec * 1_000_000 + usec
+            value = await build()
+            extra_tags = tags_of(value) if tags_of else ()
+            all_tags = tuple(dict.fromkeys((*tags, *extra_tags)))
+            stored = await self._fill(
+                keys=[redis_key, *self._tag_keys(all_tags)],
+                args=[started, json.dumps({"v": value, "t": all_tags}, ensure_ascii=False), ttl_sec],
+            )
+            if not stored:
+                self.stale_skips += 1
+            return value, all_tags, bool(stored)
+        finally:
+            if locked:
+                await self._release(keys=[lock_key], args=[token])
+
+    async def invalidate(self, *tags: str) -> int:
+        """태그가 붙은 항목을 모두 지운다. 지운 Redis 항목 수를 반환."""
+        if not tags:
+            return 0
+        self._forget(set(tags))
+        removed = await self._invalidate(keys=self._tag_keys(tags), args=[self.ttl_sec])
+        # Lua 가 돌기 직전에 저장을 마친 생성이 L1 에 넣었을 수 있어 한 번 더 지운다
+        self._forget(set(tags))
+        return removed
+
+    def _forget(self, wanted: set) -> None:
+        for key in [k for k, (_, _, t) in self._l1.items() if wanted.intersection(t)]:
+            del self._l1[key]
+
+    def invalidate_from_thread(self, *tags: str) -> None:
+        """동기 라우트(스레드풀)에서 호출할 때"""
+        anyio.from_thread.run(self.invalidate, *tags)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_size": len(self._l1),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "lock_waits": self.lock_waits,
+            "stale_skips": self.stale_skips,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache(
+    prefix="rc",
+    ttl_sec=settings.RESPONSE_CACHE_TTL_SEC,
+    l1_ttl_sec=settings.RESPONSE_CACHE_L1_TTL_SEC,
+    l1_size=settings.RESPONSE_CACHE_L1_SIZE,
+    lock_ms=settings.RESPONSE_CACHE_LOCK_MS,
+)
@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Iterator, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def estimate_chat_bytes(chat: Any) -> int:
+    """ChatSession.history 에 쌓인 텍스트 크기(바이트)를 대략 계산합니다."""
+    total = 0
+    for message in getattr(chat, "history", None) or []:
+        for part in getattr(message, "parts", None) or []:
+            text = getattr(part, "text", None)
+            if text:
+                total += len(text.encode("utf-8"))
+    return total
+
+
+class SessionCache(Generic[V]):
+    """
+    세션 키 → 객체 LRU 캐시.
+    - max_items 개를 넘거나 max_bytes 를 넘으면 가장 오래 안 쓴 항목부터 제거
+    - idle_ttl 초 동안 접근이 없으면 만료
+    제거된 세션은 호출하는 쪽에서 Redis 기록으로 다시 복원합니다.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        idle_ttl: float,
+        max_bytes: int,
+        sizeof=estimate_chat_bytes,
+    ):
+        self.max_items = max_items
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        # key -> (value, last_access, size)
+        self._items: "OrderedDict[str, Tuple[V, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ───── 조회 ─────────────────────────────────────────
+    def get(self, key: str) -> Optional[V]:
+        self.evict_expired()
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        value, _, size = item
+        self._items[key] = (value, time.monotonic(), size)
+        self._items.move_to_end(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def __getitem__(self, key: str) -> V:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._items))
+
+    # ───── 저장 / 갱신 ─────────────────────────────────────
+    def put(self, key: str, value: V) -> None:
+        self._drop(key)
+        size = self._sizeof(value)
+        self._items[key] = (value, time.monotonic(), size)
+        self._bytes += size
+        self._shrink()
+
+    __setitem__ = put
+
+    def touch(self, key: str) -> None:
+        """대화가 진행돼 history 가 늘어난 뒤 크기를 다시 계산합니다."""
+        item = self._items.get(key)
+        if item is None:
+            return
+        value, _, old_size = item
+        size = self._sizeof(value)
+        self._bytes += size - old_size
+        self._items[key] = (value, time.monotonic(), size)
+        self._items.move_to_end(key)
+        self._shrink()
+
+    # ───── 제거 ─────────────────────────────────────────
+    def pop(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        item = self._drop(key)
+        return item[0] if item else default
+
+    def __delitem__(self, key: str) -> None:
+        if self._drop(key) is None:
+            raise KeyError(key)
+
+    def evict_expired(self) -> int:
+        deadline = time.monotonic() - self.idle_ttl
+        expired = [k for k, (_, last, _) in self._items.items() if last < deadline]
+        for key in expired:
+            self._drop(key)
+        self.evictions += len(expired)
+        return len(expired)
+
+    def _shrink(self) -> None:
+        # 방금 넣은 항목(맨 뒤)은 남겨 둡니다.
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_items or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._items))
+            self._drop(key)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> Optional[Tuple[V, float, int]]:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+        return item
+
+    # ───── 통계 ─────────────────────────────────────────
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._items),
+            "bytes": self._bytes,
+            "max_sessions": self.max_items,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,265 @@
+"""
+스토리별 좋아요·댓글 수.
+
+좋아요/댓글이 생기거나 지워질 때 Redis 해시에 증감분만 HINCRBY 로 쌓고,
+주기적으로 모아서 stories.like_count / comment_count 컬럼에 한 번에 반영합니다.
+조회는 컬럼 값 + 아직 반영되지 않은 증감분이라 반영 주기와 상관없이 바로 맞습니다.
+
+반영은 묶음 단위로 멱등합니다. 떼어 낸 증감분 묶음마다 batch_id 를 붙이고, 컬럼 갱신과 같은
+트랜잭션에서 counter_batches 에 기록해 이미 반영한 묶음은 (중간에 죽고 다시 돌아도) 건너뜁니다.
+조회도 같은 SELECT 에서 묶음 반영 여부를 보고, 이미 컬럼에 들어간 증감분은 더하지 않습니다.
+reconcile 은 실제 likes / comments 행 수로 컬럼을 다시 맞춥니다 (누락·중복 반영 보정).
+
+    python -m core.story_counters              # 주기적 반영 루프
+    python -m core.story_counters --reconcile  # 한 번 보정하고 종료
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import bindparam, delete, false, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.redis import rds
+from db.base import AsyncSessionLocal
+from models.comment import Comment
+from models.counter_batch import CounterBatch
+from models.like import Like
+from models.story import Story
+
+settings = get_settings()
+
+LIKES = "likes"
+COMMENTS = "comments"
+
+PENDING_KEY = "story:counts:pending"      # "{story_id}:{kind}" -> 아직 DB 에 없는 증감분
+FLUSHING_KEY = "story:counts:flushing"    # 반영 중인 묶음 (반영 도중 죽으면 다음 번에 이어서 처리)
+NEXT_BATCH_KEY = "story:counts:next_batch"  # 지금 pending 이 떼어질 때 받을 batch_id
+BATCH_FIELD = "__batch__"
+BATCH_KEEP_SEC = 24 * 3600
+LOCK_KEY = "story:counts:lock"
+LOCK_TTL_SEC = 60
+
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release = rds.register_script(_RELEASE_LUA)
+
+# KEYS: pending, flushing, next_batch / ARGV: next_batch 가 없을 때 쓸 id, 새 next_batch
+# 반영 중인 묶음이 있으면 그 batch_id, 없으면 pending 을 떼어 next_batch 를 붙이고 그 id 를 반환 (없으면 false)
+_DETACH_LUA = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    local batch = redis.call('HGET', KEYS[2], '__batch__')
+    if not batch then
+        batch = ARGV[1]
+        redis.call('HSET', KEYS[2], '__batch__', batch)
+    end
+    return batch
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local batch = redis.call('GET', KEYS[3]) or ARGV[1]
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('HSET', KEYS[2], '__batch__', batch)
+redis.call('SET', KEYS[3], ARGV[2])
+return batch
+"""
+_detach = rds.register_script(_DETACH_LUA)
+
+_stories = Story.__table__
+_apply_deltas = (
+    _stories.update()
+    .where(_stories.c.id == bindparam("b_id"))
+    .values(
+        like_count=_stories.c.like_count + bindparam("b_likes"),
+        comment_count=_stories.c.comment_count + bindparam("b_comments"),
+    )
+)
+
+
+def _field(story_id: int, kind: str) -> str:
+    return f"{story_id}:{kind}"
+
+
+async def bump(story_id: int, kind: str, delta: int) -> None:
+    """DB 커밋 뒤에 호출. 증감분만 쌓는다."""
+    await rds.hincrby(PENDING_KEY, _field(story_id, kind), delta)
+
+
+async def get_counts(
+        db: AsyncSession,
+        story_ids: Iterable[int],
+        user_id: Optional[str] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    story_id -> {"likes": n, "comments": n} (user_id 를 주면 "liked" 도). 없는 스토리는 빠진다.
+    쿼리 한 번 + Redis 파이프라인 한 번.
+    """
+    ids = list(dict.fromkeys(story_ids))
+    if not ids:
+        return {}
+
+    # Redis 를 먼저 한 번에(MULTI) 읽고, DB 는 그 뒤 한 SELECT 로 "그 묶음이 이미 반영됐는지"와 함께 읽는다
+    fields = [_field(sid, kind) for sid in ids for kind in (LIKES, COMMENTS)]
+    async with rds.pipeline(transaction=True) as pipe:
+        pipe.hmget(PENDING_KEY, fields)
+        pipe.hmget(FLUSHING_KEY, fields)
+        pipe.hget(FLUSHING_KEY, BATCH_FIELD)
+        pipe.get(NEXT_BATCH_KEY)
+        pending, flushing, flushing_batch, next_batch = await pipe.execute()
+
+    def _applied(batch_id: Optional[str]):
+        if batch_id is None:
+            return false()
+        return select(CounterBatch.batch_id).where(CounterBatch.batch_id == batch_id).exists()
+
+    columns = [
+        Story.id,
+        Story.like_count,
+        Story.comment_count,
+        _applied(flushing_batch).label("flushing_applied"),
+        # 읽은 pending 은 다음에 떼어질 때 next_batch 를 받으므로, 그새 반영까지 끝났는지도 본다
+        _applied(next_batch).label("pending_applied"),
+    ]
+    if user_id is not None:
+        columns.append(
+            select(Like.id)
+            .where(Like.story_id == Story.id, Like.user_id == uuid.UUID(user_id))
+            .exists()
+            .label("liked")
+        )
+    rows = await db.execute(select(*columns).where(Story.id.in_(ids)))
+    counts: Dict[int, Dict[str, Any]] = {}
+    flushing_applied = pending_applied = False
+    for row in rows:
+        counts[row.id] = {LIKES: row.like_count, COMMENTS: row.comment_count}
+        if user_id is not None:
+            counts[row.id]["liked"] = row.liked
+        flushing_applied, pending_applied = row.flushing_applied, row.pending_applied
+
+    for f, p, fl in zip(fields, pending, flushing):
+        sid, kind = f.split(":")
+        if int(sid) not in counts:
+            continue
+        if not pending_applied:
+            counts[int(sid)][kind] += int(p or 0)
+        if not flushing_applied:
+            counts[int(sid)][kind] += int(fl or 0)
+    return counts
+
+
+# ───── DB 반영 ─────────────────────────────────────────────
+async def _acquire() -> Optional[str]:
+    token = uuid.uuid4().hex
+    if await rds.set(LOCK_KEY, token, nx=True, ex=LOCK_TTL_SEC):
+        return token
+    return None
+
+
+async def _flush_locked(db: AsyncSession) -> int:
+    # 이전 반영이 중간에 끊긴 묶음이 있으면 그것부터, 없으면 지금까지 쌓인 증감분을 떼어 온다
+    batch_id = await _detach(
+        keys=[PENDING_KEY, FLUSHING_KEY, NEXT_BATCH_KEY],
+        args=[uuid.uuid4().hex, uuid.uuid4().hex],
+    )
+    if not batch_id:  # 쌓인 증감분 없음
+        return 0
+
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: {LIKES: 0, COMMENTS: 0})
+    for f, value in (await rds.hgetall(FLUSHING_KEY)).items():
+        if f == BATCH_FIELD:
+            continue
+        sid, kind = f.split(":")
+        deltas[int(sid)][kind] += int(value)
+    params = [
+        {"b_id": sid, "b_likes": d[LIKES], "b_comments": d[COMMENTS]}
+        for sid, d in deltas.items()
+        if d[LIKES] or d[COMMENTS]
+    ]
+
+    now = datetime.now(timezone.utc)
+    # 묶음 기록과 컬럼 갱신을 한 트랜잭션으로: 이미 기록된 묶음이면 컬럼은 건드리지 않는다
+    first_time = (await db.execute(
+        pg_insert(CounterBatch)
+        .values(batch_id=batch_id, applied_at=now)
+        .on_conflict_do_nothing(index_elements=[CounterBatch.batch_id])
+        .returning(CounterBatch.batch_id)
+    )).first() is not None
+    if first_time and params:
+        await db.execute(_apply_deltas, params)
+    await db.execute(delete(CounterBatch).where(CounterBatch.applied_at < now - timedelta(seconds=BATCH_KEEP_SEC)))
+    await db.commit()
+    await rds.delete(FLUSHING_KEY)
+    return len(params) if first_time else 0
+
+
+async def flush_counters() -> int:
+    """쌓인 증감분을 stories 컬럼에 반영하고 갱신한 스토리 수를 반환"""
+    token = await _acquire()
+    if token is None:  # 다른 프로세스가 반영 중
+        return 0
+    try:
+        async with AsyncSessionLocal() as db:
+            return await _flush_locked(db)
+    finally:
+        await _release(keys=[LOCK_KEY], args=[token])
+
+
+async def reconcile_counters() -> int:
+    """
+    실제 행 수와 다른 스토리만 고친다. 고친 스토리 수를 반환.
+    (보정 중에 들어온 좋아요는 잠깐 한 번 더 세어질 수 있으나 다음 보정에서 맞춰진다)
+    """
+    token = await _acquire()
+    if token is None:
+        return 0
+    try:
+        async with AsyncSessionLocal() as db:
+            await _flush_locked(db)
+            likes = select(func.count(Like.id)).where(Like.story_id == Story.id).scalar_subquery()
+            comments = select(func.count(Comment.id)).where(Comment.story_id == Story.id).scalar_subquery()
+            result = await db.execute(
+                update(Story)
+                .where(or_(Story.like_count != likes, Story.comment_count != comments))
+                .values(like_count=likes, comment_count=comments)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return result.rowcount
+    finally:
+        await _release(keys=[LOCK_KEY], args=[token])
+
+
+async def run_counter_flusher() -> None:
+    last_reconcile = time.monotonic()
+    while True:
+        await asyncio.sleep(settings.COUNTER_FLUSH_SEC)
+        try:
+            await flush_counters()
+            if time.monotonic() - last_reconcile >= settings.COUNTER_RECONCILE_SEC:
+                fixed = await reconcile_counters()
+                last_reconcile = time.monotonic()
+                if fixed:
+                    print(f"[counters] 어긋난 스토리 {fixed}개를 보정했습니다")
+        except Exception as e:
+            print("[counters] 반영 실패:", repr(e))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="좋아요·댓글 수 반영 워커")
+    parser.add_argument("--reconcile", action="store_true", help="한 번 보정하고 종료")
+    args = parser.parse_args()
+    if args.reconcile:
+        print(f"[counters] 보정한 스토리: {asyncio.run(reconcile_counters())}")
+    else:
+        asyncio.run(run_counter_flusher())
@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from core.config import get_settings
+from core.redis import rds
+
+settings = get_settings()
+
+
+def _tr(digest: str) -> str:
+    return f"tr:en:{digest}"
+
+
+class TranslationCache:
+    """
+    번역 결과 캐시. 프로세스 내 LRU(L1) → Redis(L2) → 실제 번역 순서로 찾습니다.
+    같은 문장을 동시에 번역하려 하면 한 번만 호출하고 결과를 나눠 씁니다.
+    """
+
+    def __init__(self, max_items: int, ttl_sec: int, salt: str = ""):
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self.salt = salt
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    def digest(self, text: str) -> str:
+        return hashlib.sha256(f"{self.salt}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, digest: str, value: str) -> None:
+        self._items[digest] = value
+        self._items.move_to_end(digest)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    async def get_or_translate(self, text: str, translate: Callable[[str], Awaitable[str]]) -> str:
+        digest = self.digest(text)
+
+        cached: Optional[str] = self._items.get(digest)
+        if cached is not None:
+            self._items.move_to_end(digest)
+            self.l1_hits += 1
+            return cached
+
+        pending = self._inflight.get(digest)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[digest] = future
+        try:
+            cached = await rds.get(_tr(digest))
+            if cached is not None:
+                self.l2_hits += 1
+                value = cached
+            else:
+                self.misses += 1
+                value = await translate(text)
+                await rds.set(_tr(digest), value, ex=self.ttl_sec)
+            self._remember(digest, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 쪽이 없으면 "never retrieved" 경고가 남지 않도록 소비
+            future.exception()
+            raise
+        finally:
+            del self._inflight[digest]
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "size": len(self._items),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+        }
+
+
+translation_cache = TranslationCache(
+    max_items=settings.TRANSLATION_CACHE_SIZE,
+    ttl_sec=settings.TRANSLATION_CACHE_TTL_SEC,
+    salt=settings.GEMINI_MODEL,
+)
@@ -0,0 +1,229 @@
+"""
+인기 피드 (Redis sorted set).
+
+점수 = 공개 가중치 + Σ 좋아요 가중치 + Σ 댓글 가중치, 각 항목은 반감기 TRENDING_HALF_LIFE_HOURS 로 감쇠.
+모든 점수가 같은 비율로 줄어드므로 "기준 시각(epoch) 기준으로 키운 값" 2^((t - epoch)/반감기) 를
+더해 두면 순서가 그대로 유지됩니다. 그래서 이벤트마다 ZADD INCR 한 번이면 되고,
+읽기는 ZREVRANGE 로 페이지 크기만큼만 꺼냅니다.
+
+취소(좋아요 취소·댓글 삭제)는 원래 이벤트 시각의 가중치를 빼므로 오래된 좋아요를 취소해도 점수가 과하게 줄지 않습니다.
+
+값이 계속 커지지 않도록 주기적으로 DB 에서 전체를 다시 계산하면서 epoch 를 현재로 옮깁니다.
+DB 를 읽은 뒤 새 집합으로 바꾸기 전까지 들어온 이벤트는 journal 에 모아 두었다가 새 집합에 다시 반영합니다.
+재계산 표시를 켠 직후 DB 를 읽기 전에 커밋·기록된 이벤트는 두 번 더해질 수 있지만, 다음 재계산에서 맞춰집니다.
+
+    python -m core.trending   # 한 번 전체 재계산
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.redis import rds
+from db.base import AsyncSessionLocal
+from models.comment import Comment
+from models.like import Like
+from models.share import Share
+
+settings = get_settings()
+
+TRENDING_KEY = "trending:shares"
+EPOCH_KEY = "trending:epoch"
+LOCK_KEY = "trending:lock"
+
+PUBLISH = "publish"
+LIKE = "like"
+COMMENT = "comment"
+
+# 이보다 오래된 이벤트는 사실상 0 (Postgres double 언더플로 방지)
+_MIN_EXPONENT = -60
+
+REBUILD_KEY = "trending:rebuild"
+JOURNAL_KEY = "trending:journal"
+
+# epoch 기준으로 키운 가중치를 더한다. like/comment 는 이미 피드에 있는 스토리만(XX), 공개는 새로 넣을 때만(NX)
+# mode 가 rem 이면 피드에서 뺀다 (공개 취소·삭제)
+_APPLY_LUA = """
+local function apply(zset, epoch, at, weight, half_life, member, mode)
+    if mode == 'rem' then
+        return redis.call('ZREM', zset, member)
+    end
+    local delta = weight * math.pow(2, (at - epoch) / half_life)
+    if mode == 'nx' then
+        return redis.call('ZADD', zset, 'NX', delta, member)
+    end
+    return redis.call('ZADD', zset, 'XX', 'INCR', delta, member)
+end
+"""
+
+# KEYS: zset, epoch, rebuild, journal / ARGV: now, at(이벤트 시각), weight, half_life_sec, member, mode(xx|nx|rem)
+# 재계산 중이면 새 집합에도 반영할 수 있도록 journal 에 남긴다
+_EVENT_LUA = _APPLY_LUA + """
+local now = tonumber(ARGV[1])
+local epoch = tonumber(redis.call('GET', KEYS[2]) or '')
+if not epoch then
+    epoch = now
+    redis.call('SET', KEYS[2], now)
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    redis.call('RPUSH', KEYS[4], cjson.encode({ARGV[2], ARGV[3], ARGV[5], ARGV[6]}))
+end
+return apply(KEYS[1], epoch, tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5], ARGV[6])
+"""
+_event = rds.register_script(_EVENT_LUA)
+
+# KEYS: tmp, zset, epoch, rebuild, journal / ARGV: 새 epoch, half_life_sec
+# journal 의 이벤트를 새 epoch 기준으로 tmp 에 더한 뒤 통째로 바꾼다
+_SWAP_LUA = _APPLY_LUA + """
+local epoch = tonumber(ARGV[1])
+local half_life = tonumber(ARGV[2])
+for _, raw in ipairs(redis.call('LRANGE', KEYS[5], 0, -1)) do
+    local e = cjson.decode(raw)
+    apply(KEYS[1], epoch, tonumber(e[1]), tonumber(e[2]), half_life, e[3], e[4])
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+else
+    redis.call('DEL', KEYS[2])
+end
+redis.call('SET', KEYS[3], ARGV[1])
+redis.call('DEL', KEYS[4], KEYS[5])
+return 1
+"""
+_swap = rds.register_script(_SWAP_LUA)
+
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release = rds.register_script(_RELEASE_LUA)
+
+
+def _half_life_sec() -> float:
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600
+
+
+def _weight(kind: str) -> float:
+    return {
+        PUBLISH: settings.TRENDING_PUBLISH_WEIGHT,
+        LIKE: settings.TRENDING_LIKE_WEIGHT,
+        COMMENT: settings.TRENDING_COMMENT_WEIGHT,
+    }[kind]
+
+
+async def record_event(story_id: int, kind: str, sign: int = 1, at: Optional[datetime] = None) -> None:
+    """
+    좋아요·댓글, 공개 이벤트를 점수에 더한다.
+    취소(sign=-1)는 at 에 원래 이벤트 시각을 넘겨야 그때 더한 만큼만 빠진다.
+    """
+    now = time.time()
+    if at is None:
+        at_ts = now
+    else:
+        at_ts = (at if at.tzinfo else at.replace(tzinfo=timezone.utc)).timestamp()
+    mode = "nx" if kind == PUBLISH else "xx"
+    await _event(
+        keys=[TRENDING_KEY, EPOCH_KEY, REBUILD_KEY, JOURNAL_KEY],
+        args=[now, at_ts, sign * _weight(kind), _half_life_sec(), story_id, mode],
+    )
+
+
+async def remove_story(story_id: int) -> None:
+    now = time.time()
+    await _event(
+        keys=[TRENDING_KEY, EPOCH_KEY, REBUILD_KEY, JOURNAL_KEY],
+        args=[now, now, 0, _half_life_sec(), story_id, "rem"],
+    )
+
+
+async def trending_story_ids(offset: int, limit: int) -> List[int]:
+    return [int(m) for m in await rds.zrevrange(TRENDING_KEY, offset, offset + limit - 1)]
+
+
+# ───── 전체 재계산 ─────────────────────────────────────────────
+async def _compute_scores(db: AsyncSession, now: datetime) -> dict:
+    half_life = _half_life_sec()
+
+    def decayed(col):
+        exponent = func.extract("epoch", col - now) / half_life
+        return func.power(2.0, func.greatest(exponent, _MIN_EXPONENT))
+
+    likes = (
+        select(Like.story_id, func.sum(decayed(Like.created_at)).label("w"))
+        .group_by(Like.story_id)
+        .subquery()
+    )
+    comments = (
+        select(Comment.story_id, func.sum(decayed(Comment.created_at)).label("w"))
+        .group_by(Comment.story_id)
+        .subquery()
+    )
+    rows = await db.execute(
+        select(
+            Share.story_id,
+            decayed(Share.created_at).label("base"),
+            func.coalesce(likes.c.w, 0).label("likes"),
+            func.coalesce(comments.c.w, 0).label("comments"),
+        )
+        .outerjoin(likes, likes.c.story_id == Share.story_id)
+        .outerjoin(comments, comments.c.story_id == Share.story_id)
+    )
+    return {
+        row.story_id: (
+            settings.TRENDING_PUBLISH_WEIGHT * row.base
+            + settings.TRENDING_LIKE_WEIGHT * row.likes
+            + settings.TRENDING_COMMENT_WEIGHT * row.comments
+        )
+        for row in rows
+    }
+
+
+async def recompute_trending() -> int:
+    """DB 에서 점수를 다시 계산해 통째로 바꾼다. 넣은 스토리 수를 반환 (다른 프로세스가 계산 중이면 0)"""
+    token = uuid.uuid4().hex
+    if not await rds.set(LOCK_KEY, token, nx=True, ex=300):
+        return 0
+    try:
+        now = datetime.now(timezone.utc)
+        # 이 시점부터 들어오는 이벤트는 journal 에도 쌓인다 (DB 를 읽기 전에 켜야 빠지는 이벤트가 없다)
+        async with rds.pipeline(transaction=True) as pipe:
+            pipe.delete(JOURNAL_KEY)
+            pipe.set(REBUILD_KEY, now.timestamp(), ex=300)
+            await pipe.execute()
+        try:
+            async with AsyncSessionLocal() as db:
+                scores = await _compute_scores(db, now)
+        except Exception:
+            await rds.delete(REBUILD_KEY, JOURNAL_KEY)
+            raise
+
+        tmp_key = f"{TRENDING_KEY}:tmp:{token}"
+        if scores:
+            await rds.zadd(tmp_key, {str(sid): score for sid, score in scores.items()})
+        await _swap(
+            keys=[tmp_key, TRENDING_KEY, EPOCH_KEY, REBUILD_KEY, JOURNAL_KEY],
+            args=[now.timestamp(), _half_life_sec()],
+        )
+        return len(scores)
+    finally:
+        await _release(keys=[LOCK_KEY], args=[token])
+
+
+async def run_trending_recompute() -> None:
+    while True:
+        try:
+            await recompute_trending()
+        except Exception as e:
+            print("[trending] 재계산 실패:", repr(e))
+        await asyncio.sleep(settings.TRENDING_RECOMPUTE_SEC)
+
+
+if __name__ == "__main__":
+    print(f"[trending] 재계산한 스토리: {asyncio.run(recompute_trending())}")
@@ -1,7 +1,11 @@
-from typing import TypeVar, Generic, Type, List, Optional
+from typing import TypeVar, Generic, Type, List, Optional, Sequence, Tuple, Any
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
+from crud.pagination import keyset, split_page
+
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -35,6 +39,20 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def get_all(self, db: Session) -> List[ModelType]:
         return db.query(self.model).all()
 
+    def get_page(
+        self,
+        db: Session,
+        *,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        filters: Sequence[Any] = (),
+        options: Sequence[Any] = (),
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """created_at·id 가 있는 모델을 최신순으로 한 페이지 읽는다. (items, next_cursor)"""
+        query = db.query(self.model).filter(*filters).options(*options)
+        rows = keyset(query, self.model.created_at, self.model.id, cursor, limit).all()
+        return split_page(rows, limit)
+
     # ───── C ─────────────────────────────────────────────
     def create(
         self, db: Session, obj_in: CreateSchemaType, **extra
@@ -62,3 +80,56 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.delete(obj)
             db.commit()
         return obj
+
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """CRUDBase 의 AsyncSession 버전. 라우트를 하나씩 옮길 수 있도록 같은 메서드 이름을 쓴다."""
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    # ───── R ─────────────────────────────────────────────
+    async def get(self, db: AsyncSession, id: int) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        result = await db.execute(
+            select(self.model)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_all(self, db: AsyncSession) -> List[ModelType]:
+        result = await db.execute(select(self.model))
+        return list(result.scalars().all())
+
+    # ───── C ─────────────────────────────────────────────
+    async def create(
+        self, db: AsyncSession, obj_in: CreateSchemaType, **extra
+    ) -> ModelType:
+        db_obj = self.model(**obj_in.dict(), **extra)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    # ───── U ─────────────────────────────────────────────
+    async def update(
+        self, db: AsyncSession, db_obj: ModelType, obj_in: UpdateSchemaType
+    ) -> ModelType:
+        for field, value in obj_in.dict(exclude_unset=True).items():
+            setattr(db_obj, field, value)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    # ───── D ─────────────────────────────────────────────
+    async def remove(self, db: AsyncSession, id: int) -> Optional[ModelType]:
+        obj = await self.get(db, id)
+        if obj:
+            await db.delete(obj)
+            await db.commit()
+        return obj
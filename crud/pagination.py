@@ -0,0 +1,50 @@
+# crud/pagination.py
+import base64
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import tuple_
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """클라이언트가 보낸 cursor 를 해석할 수 없음"""
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def keyset(query, created_col, id_col, cursor: Optional[str], limit: int):
+    """
+    (created_at, id) 내림차순 keyset 페이지네이션.
+    OFFSET 과 달리 앞 페이지를 건너뛰며 읽지 않으므로 (created_at, id) 인덱스만 타면
+    몇 번째 페이지든 비용이 같다. 다음 페이지 유무를 알기 위해 limit + 1 개를 읽는다.
+    """
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < (created_at, last_id))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def split_page(
+        rows: Sequence[T],
+        limit: int,
+        key: Callable[[T], Tuple[datetime, int]] = lambda r: (r.created_at, r.id),
+) -> Tuple[List[T], Optional[str]]:
+    """keyset() 결과를 (이번 페이지, 다음 cursor) 로 나눈다. 마지막 페이지면 cursor 는 None."""
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    return items, encode_cursor(*key(items[-1]))
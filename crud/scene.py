@@ -1,4 +1,4 @@
-from crud.base import CRUDBase
+from crud.base import CRUDBase, AsyncCRUDBase
 from models.scene import Scene
 from schemas.scene import SceneBase, SceneCreate, SceneUpdate
 
@@ -6,4 +6,8 @@ from schemas.scene import SceneBase, SceneCreate, SceneUpdate
 class CRUDScene(CRUDBase[SceneBase, SceneCreate, SceneUpdate]):
     pass
 
-scene_crud = CRUDScene(Scene)
\ No newline at end of file
+class AsyncCRUDScene(AsyncCRUDBase[SceneBase, SceneCreate, SceneUpdate]):
+    pass
+
+scene_crud = CRUDScene(Scene)
+async_scene_crud = AsyncCRUDScene(Scene)
\ No newline at end of file
@@ -0,0 +1,97 @@
+# crud/share.py
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from crud.base import CRUDBase
+from crud.pagination import keyset, split_page
+from models.scene import Scene
+from models.share import Share
+from models.story import Story
+from models.user import User
+from schemas.share import ShareCreate
+
+
+TagMatch = Literal["any", "all"]
+
+
+def tag_filter(tags: Sequence[str], match: TagMatch = "any") -> Any:
+    """
+    all: 모든 태그를 가진 공유 (tags @> ARRAY[...]), any: 하나라도 가진 공유 (tags && ARRAY[...]).
+    둘 다 ix_shares_tags_gin 을 탄다. (tag = ANY(tags) 형태는 GIN 을 쓰지 못한다)
+    """
+    tags = list(dict.fromkeys(tags))
+    if match == "all":
+        return Share.tags.contains(tags)
+    return Share.tags.overlap(tags)
+
+
+async def count_tags(db: AsyncSession) -> List[Dict[str, Any]]:
+    """태그별 공유 수, 많은 순"""
+    tags = select(func.unnest(Share.tags).label("tag")).subquery()
+    rows = await db.execute(
+        select(tags.c.tag, func.count().label("count"))
+        .group_by(tags.c.tag)
+        .order_by(func.count().desc(), tags.c.tag)
+    )
+    return [{"tag": row.tag, "count": row.count} for row in rows]
+
+
+def _feed_select():
+    cover = (
+        select(Scene.image_url)
+        .where(Scene.story_id == Share.story_id)
+        .order_by(Scene.order_idx, Scene.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Share.id,
+            Share.story_id,
+            Share.tags,
+            Share.created_at,
+            Story.title,
+            User.nickname.label("author_nickname"),
+            cover.label("cover_image_url"),
+            Story.like_count,
+            Story.comment_count,
+        )
+        .join(Story, Story.id == Share.story_id)
+        .join(User, User.id == Share.user_id)
+    )
+
+
+class CRUDShare(CRUDBase[Share, ShareCreate, ShareCreate]):
+    def get_feed_page(
+            self,
+            db: Session,
+            *,
+            limit: int = 20,
+            cursor: Optional[str] = None,
+            tags: Sequence[str] = (),
+            match: TagMatch = "any",
+    ) -> Tuple[List[Row], Optional[str]]:
+        """
+        공유 피드 요약 행. ORM 객체와 장면 전체를 불러오지 않고
+        필요한 컬럼만 한 번의 쿼리로 뽑는다 (표지는 첫 장면 이미지, 개수는 stories 카운터 컬럼).
+        """
+        stmt = _feed_select()
+        if tags:
+            stmt = stmt.filter(tag_filter(tags, match))
+        rows = db.execute(keyset(stmt, Share.created_at, Share.id, cursor, limit)).all()
+        return split_page(rows, limit)
+
+    def get_feed_rows(self, db: Session, story_ids: Sequence[int]) -> List[Row]:
+        """주어진 스토리들의 피드 요약 행, story_ids 순서대로 (공유가 없는 스토리는 빠진다)"""
+        if not story_ids:
+            return []
+        rows = db.execute(_feed_select().where(Share.story_id.in_(story_ids))).all()
+        by_story = {row.story_id: row for row in rows}
+        return [by_story[sid] for sid in story_ids if sid in by_story]
+
+
+share_crud = CRUDShare(Share)
@@ -1,9 +1,11 @@
 # crud/story.py
 from typing import List, Optional
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from crud.base import CRUDBase
+from crud.base import CRUDBase, AsyncCRUDBase
 from models.story import Story
 from schemas.story import (
     StoryCreate,  # title
@@ -54,5 +56,21 @@ class CRUDStory(CRUDBase[Story, StoryCreate, StoryUpdate]):
         )
 
 
+class AsyncCRUDStory(AsyncCRUDBase[Story, StoryCreate, StoryUpdate]):
+    async def get_with_scenes(
+            self,
+            db: AsyncSession,
+            id: int,
+    ) -> Optional[Story]:
+        # AsyncSession 은 지연 로딩이 안 되므로 scenes 를 미리 불러온다
+        result = await db.execute(
+            select(Story)
+            .options(selectinload(Story.scenes))
+            .where(Story.id == id)
+        )
+        return result.scalars().first()
+
+
 # 싱글턴 인스턴스
 story_crud = CRUDStory(Story)
+async_story_crud = AsyncCRUDStory(Story)
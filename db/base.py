@@ -1,15 +1,29 @@
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from starlette.requests import HTTPConnection
 from core.config import get_settings
+from db.pool import TimedQueuePool, TimedAsyncQueuePool, watch_pre_ping, pool_snapshot
 
 settings = get_settings()
 
+T = TypeVar("T")
+
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+    pool_recycle=settings.DB_POOL_RECYCLE_SEC,
     pool_pre_ping=True,
     future=True,
 )
+watch_pre_ping(engine, TimedQueuePool.metrics)
 
 # 세션 팩토리
 SessionLocal = sessionmaker(
@@ -19,13 +33,114 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+
+def _async_url() -> str:
+    """ASYNC_DATABASE_URL 이 없으면 DATABASE_URL 의 드라이버만 asyncpg 로 바꿔 쓴다"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# 비동기 엔진 (async 라우트·WebSocket 에서 이벤트 루프를 막지 않도록)
+async_engine = create_async_engine(
+    _async_url(),
+    echo=settings.DEBUG,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+    pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+    pool_pre_ping=True,
+)
+watch_pre_ping(async_engine.sync_engine, TimedAsyncQueuePool.metrics)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base 클래스
 Base = declarative_base()
 
+# ───── 요청 단위 지연 세션 ─────────────────────────────────────
+_stats = {
+    "requests": 0,          # LazySession 이 만들어진 요청 수
+    "sessions_opened": 0,   # 그중 실제로 Session 을 연 요청 수
+}
+
+
+class LazySession:
+    """
+    요청 하나에서 request.state.db 와 get_db 가 함께 쓰는 세션.
+    처음 사용할 때 Session 을 만들고, 커넥션은 Session 이 첫 쿼리에서 풀에서 꺼낸다.
+    DB 를 쓰지 않는 요청(/, 정적 파일, admin 화면 등)은 커넥션을 전혀 잡지 않는다.
+    """
+
+    def __init__(self):
+        self._session: Optional[Session] = None
+        self._closed = False
+        _stats["requests"] += 1
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    def _get(self) -> Session:
+        if self._closed:
+            # 요청이 끝난 뒤에 쓰면 아무도 닫지 않는 세션이 새로 열리므로 막는다
+            raise RuntimeError("request DB session used after the request finished")
+        if self._session is None:
+            self._session = SessionLocal()
+            _stats["sessions_opened"] += 1
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def close(self) -> None:
+        self._closed = True
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def pool_stats() -> dict:
+    return {
+        "requests": _stats,
+        "sync": pool_snapshot(engine, TimedQueuePool.metrics),
+        "async": pool_snapshot(async_engine.sync_engine, TimedAsyncQueuePool.metrics),
+    }
+
+
 # 의존성 주입용 DB 세션
-def get_db():
+# 미들웨어가 만든 요청 세션이 있으면 그것을 같이 쓰고, 없으면(WebSocket 등) 새로 연다
+def get_db(conn: HTTPConnection):
+    shared = getattr(conn.state, "db", None)
+    if isinstance(shared, LazySession):
+        yield shared
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# 요청보다 오래 살 수 있는 작업(응답 캐시 생성 등)은 요청 세션 대신 자기 세션을 열고 닫는다
+def run_in_own_session(fn: Callable[..., T], *args: Any) -> T:
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+async def run_in_own_async_session(fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+    async with AsyncSessionLocal() as db:
+        return await fn(db, *args)
+
+
+# 의존성 주입용 비동기 DB 세션
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,81 @@
+"""
+기존 DB 를 현재 모델에 맞추는 멱등 마이그레이션.
+
+Base.metadata.create_all 은 없는 테이블만 만들고, 이미 있는 테이블에
+컬럼·인덱스를 더하지 않으므로 운영 DB 는 이 스크립트로 맞춥니다.
+여러 번 실행해도 안전합니다.
+
+새 컬럼은 모델이 바로 읽으므로 앱 시작 때도 add_missing_columns() 로 더합니다
+(기본값이 상수라 테이블을 다시 쓰지 않는 가벼운 ALTER 입니다).
+좋아요 등록의 ON CONFLICT 가 기대는 uq_likes_user_id_story_id 도 없으면 앱 시작 때
+ensure_like_unique_index() 로 중복을 정리하고 만듭니다.
+나머지 인덱스·검색 문서 채우기는 오래 걸릴 수 있어 이 스크립트로만 합니다.
+
+    python -m db.migrate
+"""
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+import models  # noqa: F401  (모든 모델을 metadata 에 등록)
+from db.base import Base, engine, SessionLocal
+from models.like import Like
+from sevices.search import backfill_search
+
+# create_all 이 기존 테이블에 더해 주지 않는 컬럼
+_ADD_COLUMNS = [
+    "ALTER TABLE stories ADD COLUMN IF NOT EXISTS like_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE stories ADD COLUMN IF NOT EXISTS comment_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE stories ADD COLUMN IF NOT EXISTS search_vector TSVECTOR",
+    "ALTER TABLE scenes ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ",
+]
+
+# uq_likes_user_id_story_id 를 만들기 전에 중복 좋아요를 가장 먼저 누른 것 하나만 남긴다
+_DEDUPE_LIKES = """
+DELETE FROM likes a
+USING likes b
+WHERE a.user_id = b.user_id
+  AND a.story_id = b.story_id
+  AND a.id > b.id
+"""
+
+
+def add_missing_columns() -> None:
+    with engine.begin() as conn:
+        for stmt in _ADD_COLUMNS:
+            conn.execute(text(stmt))
+
+
+def ensure_like_unique_index() -> None:
+    # 이미 있으면 중복 정리(테이블 전체 조인)를 건너뛴다
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT to_regclass('uq_likes_user_id_story_id')")).scalar() is not None:
+            return
+        removed = conn.execute(text(_DEDUPE_LIKES)).rowcount
+        if removed:
+            print(f"[migrate] 중복 좋아요 {removed}개 삭제")
+        index = next(i for i in Like.__table__.indexes if i.name == "uq_likes_user_id_story_id")
+        conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def migrate() -> None:
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    ensure_like_unique_index()
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                conn.execute(CreateIndex(index, if_not_exists=True))
+                print(f"[migrate] {table.name}.{index.name}")
+    with SessionLocal() as db:
+        filled = backfill_search(db)
+        if filled:
+            print(f"[migrate] 검색 문서 {filled}개 생성")
+
+
+if __name__ == "__main__":
+    migrate()
+    # 새로 생긴 카운터 컬럼과 중복 삭제를 실제 행 수로 맞춘다
+    from core.story_counters import reconcile_counters
+    print(f"[migrate] 카운터 보정: {asyncio.run(reconcile_counters())}개 스토리")
@@ -0,0 +1,50 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from core.pool_metrics import PoolMetrics
+
+
+class _TimedCheckout:
+    """QueuePool 계열에서 커넥션을 꺼낼 때까지 걸린 시간과 오버플로를 기록한다"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = self.metrics.wait_started()
+        overflow_before = self.overflow()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.wait_finished(started)
+        if self.overflow() > max(overflow_before, 0):
+            self.metrics.overflow_events += 1
+        return conn
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics = PoolMetrics("sync")
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics("async")
+
+
+def watch_pre_ping(engine: Engine, metrics: PoolMetrics) -> None:
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        if context.is_pre_ping:
+            metrics.pre_ping_failures += 1
+
+
+def pool_snapshot(engine: Engine, metrics: PoolMetrics) -> dict:
+    pool = engine.pool
+    return {
+        **metrics.snapshot(),
+        "checked_out": pool.checkedout(),
+        "pool_size": pool.size(),
+        "overflow": max(pool.overflow(), 0),
+    }
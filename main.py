@@ -4,11 +4,19 @@ from fastapi.responses import FileResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
+import asyncio
+
+from core.cluade import close_clova_session
+from core.story_counters import run_counter_flusher
+from core.related import run_related_rebuild
+from core.trending import run_trending_recompute
 from core.config import get_settings
 from core.security import decode_token
-from db.base import Base, engine, get_db
+from db.base import Base, engine, LazySession
+from db.migrate import add_missing_columns, ensure_like_unique_index
 from admin.setup import setup_admin
 from admin.views.auth import router as auth_router
+from admin.views.metrics import router as metrics_router
 from api.v1.routers import router as v1_router
 import os
 
@@ -23,8 +31,27 @@ app = FastAPI(
     version="1.0.1"
 )
 
-# DB 초기화
+# DB 초기화 (기존 테이블에는 새 컬럼과 좋아요 유니크 인덱스만 더한다. 나머지 인덱스는 python -m db.migrate)
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
+ensure_like_unique_index()
+
+# 종료 시 외부 API 커넥션 풀 정리
+app.add_event_handler("shutdown", close_clova_session)
+
+# 백그라운드 작업: 좋아요·댓글 수 반영, 인기 피드·관련 스토리 재계산 (여러 워커가 돌아도 Redis 락으로 하나만 실행)
+_background_tasks = []
+
+async def start_background_jobs():
+    if settings.COUNTER_FLUSH_IN_APP:
+        _background_tasks.append(asyncio.create_task(run_counter_flusher()))
+    # 인기 피드 전체 재계산 (시작 시 한 번 + 주기적으로, Redis 락으로 한 프로세스만)
+    if settings.TRENDING_IN_APP:
+        _background_tasks.append(asyncio.create_task(run_trending_recompute()))
+    if settings.RELATED_IN_APP:
+        _background_tasks.append(asyncio.create_task(run_related_rebuild()))
+
+app.add_event_handler("startup", start_background_jobs)
 
 # CORS
 app.add_middleware(
@@ -38,21 +65,22 @@ app.add_middleware(
 # 1) SQLAdmin UI (prefix=/admin/dashboard)
 setup_admin(app, engine)
 
-# 2) 커스텀 로그인 라우터 (/admin/login)
+# 2) 커스텀 로그인 라우터 (/admin/login), 운영 지표 (/admin/metrics)
 app.include_router(auth_router)
+app.include_router(metrics_router)
 
 # 3) Illustration 정적 파일
 app.mount("/illustrations", StaticFiles(directory="static/illustrations"), name="illustrations")
 
-# 4) DB 세션 미들웨어
+# 4) DB 세션 미들웨어 (실제로 쓰일 때만 세션을 연다)
 @app.middleware("http")
 async def db_session_middleware(request: Request, call_next):
-    gen = get_db(); db = next(gen)
+    db = LazySession()
+    request.state.db = db
     try:
-        request.state.db = db
         return await call_next(request)
     finally:
-        gen.close()
+        db.close()
 
 # 5) /admin/* 보호 미들웨어
 @app.middleware("http")
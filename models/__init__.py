@@ -3,4 +3,5 @@ from .comment import Comment
 from .story import Story
 from .like import Like
 from .share import Share
-from .report import Report
\ No newline at end of file
+from .report import Report
+from .counter_batch import CounterBatch
\ No newline at end of file
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import String, Text, DateTime, ForeignKey
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from db.base import Base
@@ -21,3 +21,9 @@ class Comment(Base):
     story: Mapped["Story"] = relationship("Story", back_populates="comments")
     user: Mapped["User"] = relationship("User", back_populates="comments")
     reports: Mapped[List["Report"]] = relationship("Report", back_populates="comment", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # 스토리별 댓글 목록 (updated_at 순)
+        Index("ix_comments_story_id_updated_at", "story_id", "updated_at"),
+        Index("ix_comments_user_id", "user_id"),
+    )
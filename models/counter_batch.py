@@ -0,0 +1,18 @@
+from __future__ import annotations
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from db.base import Base
+
+class CounterBatch(Base):
+    """stories.like_count / comment_count 에 이미 반영한 Redis 증감분 묶음 (같은 묶음을 두 번 더하지 않도록)"""
+    __tablename__ = "counter_batches"
+
+    batch_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # 오래된 기록 정리
+        Index("ix_counter_batches_applied_at", "applied_at"),
+    )
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import String, Text, DateTime, ForeignKey
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from db.base import Base
@@ -17,4 +17,10 @@ class Like(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
     story: Mapped['Story'] = relationship("Story", back_populates="likes")
-    user: Mapped['User'] = relationship("User", back_populates="likes")
\ No newline at end of file
+    user: Mapped['User'] = relationship("User", back_populates="likes")
+
+    __table_args__ = (
+        # 한 사용자는 스토리 하나에 좋아요 한 번 (INSERT ... ON CONFLICT 대상)
+        Index("uq_likes_user_id_story_id", "user_id", "story_id", unique=True),
+        Index("ix_likes_story_id", "story_id"),
+    )
\ No newline at end of file
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Text, DateTime, ForeignKey
+from sqlalchemy import Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 from db.base import Base
@@ -23,6 +23,12 @@ class Report(Base):
     story: Mapped[Optional["Story"]] = relationship("Story", back_populates="reports")
     comment: Mapped[Optional["Comment"]] = relationship("Comment", back_populates="reports")
 
+    __table_args__ = (
+        Index("ix_reports_story_id", "story_id"),
+        Index("ix_reports_comment_id", "comment_id"),
+        Index("ix_reports_reporter_id", "reporter_id"),
+    )
+
     @hybrid_property
     def target_type(self) -> str:
         if self.story_id is not None:
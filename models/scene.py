@@ -2,7 +2,7 @@ from __future__ import annotations
 from datetime import datetime
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Sequence
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Sequence, Index
 
 from db.base import Base
 
@@ -26,5 +26,16 @@ class Scene(Base):
         default=datetime.utcnow,
         nullable=False
     )
+    # 관리 화면 등에서 장면을 고치면 바뀐다 (스토리 ETag 에 들어감)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        onupdate=datetime.utcnow,
+        nullable=True
+    )
 
     story: Mapped["Story"] = relationship(back_populates="scenes")
+
+    __table_args__ = (
+        # 스토리의 장면 순서 / 피드 표지(첫 장면)
+        Index("ix_scenes_story_id_order_idx", "story_id", "order_idx", "id"),
+    )
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import String, DateTime, ForeignKey, ARRAY
+from sqlalchemy import String, DateTime, ForeignKey, ARRAY, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from db.base import Base
@@ -18,4 +18,13 @@ class Share(Base):
     tags: Mapped[List[str]] = mapped_column(ARRAY(String), default=list, nullable=False)
 
     story: Mapped['Story'] = relationship("Story", back_populates="shares")
-    user: Mapped['User'] = relationship("User", back_populates="shares")
\ No newline at end of file
+    user: Mapped['User'] = relationship("User", back_populates="shares")
+
+    __table_args__ = (
+        # 피드 keyset 페이지네이션
+        Index("ix_shares_created_at_id", "created_at", "id"),
+        Index("ix_shares_story_id_user_id", "story_id", "user_id"),
+        Index("ix_shares_user_id", "user_id"),
+        # 태그 포함(@>)·겹침(&&) 검색
+        Index("ix_shares_tags_gin", "tags", postgresql_using="gin"),
+    )
\ No newline at end of file
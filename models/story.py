@@ -5,7 +5,8 @@ from datetime import datetime
 from typing import List, Optional
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Column, Boolean
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Column, Boolean, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from db.base import Base
@@ -19,6 +20,11 @@ class Story(Base):
     user: Mapped["User"] = relationship(back_populates="stories")
     original :Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     title: Mapped[str] = mapped_column(String(255))
+    # core.story_counters 가 주기적으로 반영하는 비정규화 카운터
+    like_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    comment_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # 제목·장면 n-gram 검색 문서 (sevices.search 가 갱신)
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
@@ -57,6 +63,18 @@ class Story(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # keyset 페이지네이션: (created_at, id) 내림차순 목록
+        Index("ix_stories_created_at_id", "created_at", "id"),
+        Index("ix_stories_user_id_created_at_id", "user_id", "created_at", "id"),
+        # 원작 목록은 전체 중 일부라 부분 인덱스로 충분하다
+        Index(
+            "ix_stories_original_created_at_id", "created_at", "id",
+            postgresql_where=original.is_(True),
+        ),
+        Index("ix_stories_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     @hybrid_property
     def user_nickname(self) -> str:
         return self.user.nickname if self.user else ""
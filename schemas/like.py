@@ -1,8 +1,17 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 from uuid import UUID
 
 class ReportCreate(BaseModel):
     story_id: Optional[int]
     comment_id: Optional[int]
     reason: str
+
+class LikeBatchIn(BaseModel):
+    story_ids: List[int] = Field(..., max_length=100)
+
+class LikeStatusOut(BaseModel):
+    story_id: int
+    likes: int
+    comments: int
+    liked: bool
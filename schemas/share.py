@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from schemas.story import StoryOutWithDetail
 
@@ -21,3 +21,30 @@ class ShareOut(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ShareFeedItem(BaseModel):
+    """공유 피드 목록용 요약 (장면 본문은 상세 조회에서)"""
+    id: int
+    story_id: int
+    title: str
+    author_nickname: str
+    cover_image_url: Optional[str]
+    tags: List[str]
+    like_count: int
+    comment_count: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ShareFeedOut(BaseModel):
+    items: List[ShareFeedItem]
+    next_cursor: Optional[str] = None
+
+class TrendingOut(BaseModel):
+    items: List[ShareFeedItem]
+    next_offset: Optional[int] = None
+
+class TagFacet(BaseModel):
+    tag: str
+    count: int
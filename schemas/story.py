@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import List, Optional, TypedDict
+from typing import List, Optional, TypedDict, NotRequired
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -48,16 +48,33 @@ class StoryOut(BaseModel):
 
 class StoriesOut(BaseModel):
     stories: List[StoryOut]
+    next_cursor: Optional[str] = None  # 다음 페이지 요청에 넘길 값, 마지막 페이지면 None
     model_config = ConfigDict(from_attributes=True)
 
 
 class StoriesOutWithDetail(BaseModel):
     stories: List[StoryOutWithDetail]
+    next_cursor: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
 
+class StorySearchHit(BaseModel):
+    id: int
+    title: str
+    original: bool
+    created_at: datetime
+    rank: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StorySearchOut(BaseModel):
+    stories: List[StorySearchHit]
+    next_offset: Optional[int] = None  # 다음 페이지 offset, 마지막 페이지면 None
+
 class ClientStart(TypedDict):
     type: str
     text: str
+    stream: NotRequired[bool]  # True 면 질문을 생성 중에 question_partial 로 받는다
 
 
 class ClientAnswer(TypedDict):
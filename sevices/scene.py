@@ -1,8 +1,15 @@
-from crud.scene import scene_crud
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.response_cache import response_cache
+from crud.scene import async_scene_crud
 from schemas.scene import SceneCreate
+from sevices.search import append_scene_search
 
 
-def create_scene(db,story_id, synopsis, chosen_url):
+async def create_scene(db: AsyncSession, story_id, synopsis, chosen_url):
     scene_in = SceneCreate(text=synopsis, image_url=chosen_url,story_id=story_id)
-    new_scene = scene_crud.create(db,scene_in)
+    new_scene = await async_scene_crud.create(db,scene_in)
+    # story_id 는 세션 키에서 잘라 온 문자열일 수 있으므로 저장된 값(int)을 쓴다
+    await append_scene_search(db, new_scene.story_id, synopsis)
+    await response_cache.invalidate(f"story:{new_scene.story_id}")
     return new_scene
\ No newline at end of file
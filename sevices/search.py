@@ -0,0 +1,134 @@
+"""
+스토리 검색 (제목 + 장면 본문).
+
+한국어는 형태소 분석 없이 공백 단위로 자르면 조사·어미 때문에 잘 맞지 않으므로
+단어를 2글자 n-gram 으로 쪼개 'simple' tsvector 에 넣습니다 ("토끼가" → 토끼, 끼가).
+검색어도 같은 방식으로 쪼개 모든 n-gram 이 들어 있는 스토리를 찾고, 제목(A) 가중치를 높여 순위를 매깁니다.
+stories.search_vector 는 장면 저장(create_scene)·공유(publish_story) 때 갱신됩니다.
+"""
+import re
+from typing import Iterable, List, Sequence
+
+from sqlalchemy import func, or_, select, update, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.scene import Scene
+from models.share import Share
+from models.story import Story
+
+NGRAM = 2
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def ngrams(text: str, n: int = NGRAM) -> List[str]:
+    grams: List[str] = []
+    for word in _WORD_RE.findall(text.lower()):
+        if len(word) <= n:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def _vector(text: str, weight: str):
+    return func.setweight(func.to_tsvector("simple", " ".join(ngrams(text))), weight)
+
+
+def search_document(title: str, scene_texts: Iterable[str]):
+    """제목(A) + 장면 본문(B) tsvector 식"""
+    return _vector(title or "", "A").op("||")(_vector(" ".join(scene_texts), "B"))
+
+
+def search_query(q: str):
+    """
+    모든 n-gram 을 AND 로 묶은 tsquery. 한 글자 단어는 그 글자로 시작하는 n-gram 과 prefix 로 맞춘다.
+    검색할 글자가 없으면 None.
+    """
+    terms = []
+    for gram in dict.fromkeys(ngrams(q)):
+        terms.append(f"{gram}:*" if len(gram) < NGRAM else gram)
+    if not terms:
+        return None
+    return func.to_tsquery("simple", " & ".join(terms))
+
+
+# ───── 색인 갱신 ─────────────────────────────────────────────
+def _scene_texts(story_id: int):
+    return select(Scene.text).where(Scene.story_id == story_id).order_by(Scene.order_idx, Scene.id)
+
+
+def _document_update(story_id: int, title: str, texts: Iterable[str]):
+    return (
+        update(Story)
+        .where(Story.id == story_id)
+        .values(search_vector=search_document(title, [t or "" for t in texts]))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def refresh_story_search(db: Session, story_id: int) -> None:
+    """스토리 하나의 검색 문서를 제목과 전체 장면으로 다시 만든다 (커밋은 호출한 쪽에서)"""
+    story = db.get(Story, story_id)
+    if story is None:
+        return
+    texts = db.execute(_scene_texts(story_id)).scalars().all()
+    db.execute(_document_update(story_id, story.title, texts))
+
+
+async def refresh_story_search_async(db: AsyncSession, story_id: int) -> None:
+    title = (await db.execute(select(Story.title).where(Story.id == story_id))).scalar_one_or_none()
+    if title is None:
+        return
+    texts = (await db.execute(_scene_texts(story_id))).scalars().all()
+    await db.execute(_document_update(story_id, title, texts))
+
+
+async def append_scene_search(db: AsyncSession, story_id: int, text: str) -> None:
+    """
+    새 장면의 n-gram 만 기존 검색 문서 뒤에 붙인다.
+    아직 문서가 없으면(원작, 처음 장면) 붙일 곳이 없으므로 제목 + 전체 장면으로 새로 만든다.
+    """
+    result = await db.execute(
+        update(Story)
+        .where(Story.id == story_id, Story.search_vector.is_not(None))
+        .values(search_vector=Story.search_vector.op("||")(_vector(text or "", "B")))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await refresh_story_search_async(db, story_id)
+    await db.commit()
+
+
+def backfill_search(db: Session, batch: int = 200) -> int:
+    """search_vector 가 비어 있는 스토리를 채운다. 채운 수를 반환."""
+    done = 0
+    while True:
+        ids: Sequence[int] = db.execute(
+            select(Story.id).where(Story.search_vector.is_(None)).limit(batch)
+        ).scalars().all()
+        if not ids:
+            return done
+        for story_id in ids:
+            refresh_story_search(db, story_id)
+        db.commit()
+        done += len(ids)
+
+
+# ───── 검색 ─────────────────────────────────────────────
+async def search_stories(db: AsyncSession, q: str, *, limit: int, offset: int = 0):
+    """원작 또는 공유된 스토리 중 검색어와 맞는 것 (순위 높은 순)"""
+    query = search_query(q)
+    if query is None:
+        return []
+    rank = func.ts_rank_cd(Story.search_vector, query).label("rank")
+    shared = exists().where(Share.story_id == Story.id)
+    rows = await db.execute(
+        select(Story.id, Story.title, Story.original, Story.created_at, rank)
+        .where(Story.search_vector.op("@@")(query))
+        .where(or_(Story.original.is_(True), shared))
+        .order_by(rank.desc(), Story.id.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+    return rows.all()
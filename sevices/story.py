@@ -1,9 +1,17 @@
 import re
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from crud.story import story_crud
+from core.etag import make_etag
+from core.response_cache import response_cache, cache_key
+from crud.story import story_crud, async_story_crud
+from db.base import run_in_own_session
+from models.scene import Scene
+from models.share import Share
 from models.story import Story
 from schemas.story import StoryCreate
 
@@ -30,6 +38,67 @@ def get_all_stories_by_user_id(db: Session,user_id : str):
     stories = story_crud.get_all_by_user(db, user_id)
     return stories
 
+def get_story_page(
+        db: Session,
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+        original: Optional[bool] = None,
+        with_scenes: bool = False,
+) -> Tuple[List[Story], Optional[str]]:
+    filters = []
+    if user_id is not None:
+        filters.append(Story.user_id == user_id)
+    if original is not None:
+        filters.append(Story.original.is_(original))
+    # 장면까지 내려줄 때는 스토리마다 지연 로딩하지 않도록 IN 쿼리 한 번으로 읽는다
+    options = [selectinload(Story.scenes)] if with_scenes else []
+    return story_crud.get_page(db, limit=limit, cursor=cursor, filters=filters, options=options)
+
+def get_story_version(db: Session, story_id: int) -> Optional[dict]:
+    """
+    스토리 본문을 불러오지 않고 버전만 읽는다: {"user_id", "etag"}. 없으면 None.
+    장면은 추가·삭제(개수, 마지막 id)뿐 아니라 관리 화면에서 수정(마지막 updated_at)도 되므로 셋 다 넣고,
+    공유 태그도 상세 응답에 들어가므로 포함한다.
+    """
+    scene_count = select(func.count(Scene.id)).where(Scene.story_id == story_id).scalar_subquery()
+    last_scene = select(func.max(Scene.id)).where(Scene.story_id == story_id).scalar_subquery()
+    scene_stamp = (
+        select(func.max(func.coalesce(Scene.updated_at, Scene.created_at)))
+        .where(Scene.story_id == story_id)
+        .scalar_subquery()
+    )
+    tags = select(Share.tags).where(Share.story_id == story_id).limit(1).scalar_subquery()
+    row = db.execute(
+        select(
+            Story.user_id,
+            Story.title,
+            func.coalesce(Story.updated_at, Story.created_at).label("stamp"),
+            scene_count.label("scene_count"),
+            last_scene.label("last_scene"),
+            scene_stamp.label("scene_stamp"),
+            tags.label("tags"),
+        )
+        .where(Story.id == story_id)
+    ).first()
+    if row is None:
+        return None
+    return {
+        "user_id": str(row.user_id),
+        "etag": make_etag(
+            story_id, row.title, row.stamp, row.scene_count, row.last_scene, row.scene_stamp, row.tags
+        ),
+    }
+
+async def get_story_version_cached(story_id: int) -> Optional[dict]:
+    """get_story_version 을 응답 캐시에 둔다. 장면 추가·공유·삭제 때 story:{id} 로 지워진다."""
+    return await response_cache.get_or_build(
+        cache_key("story_version", story_id=story_id),
+        lambda: run_in_threadpool(run_in_own_session, get_story_version, story_id),
+        tags=(f"story:{story_id}",),
+    )
+
 def check_story_auth(db: Session, story_id: int, user_id: str):
     story = story_crud.get(db,story_id)
     if story is None:
@@ -42,6 +111,19 @@ def get_story_by_story_id(db: Session, story_id: int):
         return False
     return story
 
+# ───── AsyncSession 용 (async 라우트·WebSocket) ─────
+async def check_story_auth_async(db: AsyncSession, story_id: int, user_id: str):
+    story = await async_story_crud.get(db,story_id)
+    if story is None:
+        return False
+    return str(story.user_id) == user_id
+
+async def get_story_by_story_id_async(db: AsyncSession, story_id: int):
+    story = await async_story_crud.get(db,story_id)
+    if story is None:
+        return False
+    return story
+
 def delete_story_by_story_id(db: Session, story_id: int):
     story = story_crud.get(db,story_id)
     if story is None:
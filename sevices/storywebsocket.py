@@ -1,4 +1,3 @@
-import asyncio
 import re
 from enum import Enum, auto
 from typing import List, Tuple
@@ -7,19 +6,19 @@ from fastapi import WebSocket, WebSocketException
 
 from core.chat_manager import (
     send_message,
-    append_history,
+    stream_message,
+    flush_history,
     mark_done,
     rds,
     _meta
 )
-from core.cluade import send_clova_chat
+from core.cluade import refine_with_clova
 from core.config import get_settings
-from core.image_manager import gen_two_images
-from core.image_manager_dall import gen_two_images_with_dall
-from core.security import decode_token
+from core.illust_queue import enqueue_illustration, wait_for_job, IMAGES_PER_JOB, QUEUED, RUNNING
+from core.redis import queue_history, get_meta, update_meta
 from schemas.story import ClientStart, ClientAnswer, ClientChoice, ClientCmd
 from sevices.scene import create_scene
-from sevices.story import get_story_by_story_id
+from sevices.story import get_story_by_story_id_async
 
 
 ILLUST_OK = "ILLUST_OK"
@@ -145,13 +144,14 @@ class State(Enum):
 settings = get_settings()
 class StorybookService:
     def __init__(self, session_key: str):
-        self.available_cmd = ["quiz", "scene"]
+        self.available_cmd = ["quiz", "scene", "resume"]
         self.session_key = session_key
         self.state       = State.ILLUST_INFO
-        self.img_task: asyncio.Task | None = None
+        self.img_job: str | None = None
         self.urls: List[str] = []
         self.chosen_url: str = ""
         self.synopsis: str   = ""
+        self.stream: bool    = False
 
     async def handle(self, ws: WebSocket):
         if not await rds.exists(_meta(self.session_key)):
@@ -160,34 +160,60 @@ class StorybookService:
         await ws.accept(subprotocol="jwt")
 
         start: ClientStart = await ws.receive_json()
-        await append_history(self.session_key, "U", start.get("text", ""))
         if start.get("type") not in self.available_cmd:
             raise WebSocketException(code=1008)
 
-        topic = "" if start.get("type") == "quiz" else start["text"]
+        self.stream = bool(start.get("stream", False))
+        if start.get("type") == "resume":
+            topic = await self._resume()
+        else:
+            queue_history(self.session_key, "U", start.get("text", ""))
+            topic = "" if start.get("type") == "quiz" else start["text"]
+            await update_meta(self.session_key, topic=topic, illust_job=None, synopsis=None)
         if start.get("type") == "quiz":
             self.state = State.QUIZ
 
-        while True:
-            if   self.state is State.ILLUST_INFO:    await self._illust_info_loop(ws, topic)
-            elif self.state is State.SCENE_SYNOPSIS: await self._scene_synopsis_loop(ws)
-            elif self.state is State.ILLUST_WAIT:    await self._wait_for_images(ws)
-            elif self.state is State.CHOICE_WAIT:    await self._handle_choice(ws)
-            elif self.state is State.DRAFT_REVIEW:   await self._review_draft(ws)
-            elif self.state is State.QUIZ:           await self._quiz_loop(ws)
-            elif self.state is State.EXTEND:         await self._illust_info_loop(ws,"이제 다음 씬을 만들 준비를 해야해. 똑같은 방법으로 씬을 만들어내면 돼 \n")
-
-            if self.state is State.FINISHED:
-                await ws.close()
-                break
+        try:
+            while True:
+                if   self.state is State.ILLUST_INFO:    await self._illust_info_loop(ws, topic)
+                elif self.state is State.SCENE_SYNOPSIS: await self._scene_synopsis_loop(ws)
+                elif self.state is State.ILLUST_WAIT:    await self._wait_for_images(ws)
+                elif self.state is State.CHOICE_WAIT:    await self._handle_choice(ws)
+                elif self.state is State.DRAFT_REVIEW:   await self._review_draft(ws)
+                elif self.state is State.QUIZ:           await self._quiz_loop(ws)
+                elif self.state is State.EXTEND:         await self._illust_info_loop(ws,"이제 다음 씬을 만들 준비를 해야해. 똑같은 방법으로 씬을 만들어내면 돼 \n")
+
+                if self.state is State.FINISHED:
+                    await ws.close()
+                    break
+        finally:
+            # 연결이 끊겨도 버퍼에 남은 history 는 기록한다
+            await flush_history(self.session_key)
+
+    # ────────────────────────────────────────────
+    # 다시 연결: meta 에 남긴 삽화 작업·시놉시스로 이어서 진행
+    async def _resume(self) -> str:
+        meta = await get_meta(self.session_key)
+        if meta is None or meta.get("status") == "done":
+            raise WebSocketException(code=1008)
+        self.img_job = meta.get("illust_job")
+        self.synopsis = meta.get("synopsis") or ""
+        if self.img_job and self.synopsis:
+            # 작업이 이미 끝났으면 바로 결과를 받고, 아니면 남은 시간만큼 기다린다
+            self.state = State.ILLUST_WAIT
+        elif self.img_job:
+            self.state = State.SCENE_SYNOPSIS
+        else:
+            self.state = State.ILLUST_INFO
+        return meta.get("topic") or ""
 
     # ────────────────────────────────────────────
     # ILLUST_INFO 단계
     async def _illust_info_loop(self, ws: WebSocket, topic: str):
         prompt = build_illust_info_prompt(topic, ILLUST_OK)
-        await append_history(self.session_key, "AI", prompt)
-        txt = await send_message(self.session_key, prompt)
-        await append_history(self.session_key, "AI", txt)
+        queue_history(self.session_key, "AI", prompt)
+        txt = await self._ask(ws, prompt)
+        queue_history(self.session_key, "AI", txt)
 
         while True:
             if WARNING in txt:
@@ -196,10 +222,9 @@ class StorybookService:
             if ILLUST_OK in txt:
                 illust_prompt = txt.replace(ILLUST_OK, "").strip()
                 if illust_prompt:
-                    if not settings.USING_DALL:
-                        self.img_task = asyncio.create_task(gen_two_images(illust_prompt))
-                    else:
-                        self.img_task = asyncio.create_task(gen_two_images_with_dall(illust_prompt))
+                    self.img_job = await enqueue_illustration(illust_prompt)
+                    # 연결이 끊겨도 다시 붙어서 이 작업의 결과를 받을 수 있도록
+                    await update_meta(self.session_key, illust_job=self.img_job)
                     self.state = State.SCENE_SYNOPSIS
                 else:
                     self.state = State.ILLUST_INFO
@@ -209,17 +234,17 @@ class StorybookService:
             await ws.send_json({"type": "question", "text": q, "examples": ex})
 
             ans: ClientAnswer = await ws.receive_json()
-            await append_history(self.session_key, "U", ans["text"])
-            txt = await send_message(self.session_key, ans["text"])
-            await append_history(self.session_key, "AI", txt)
+            queue_history(self.session_key, "U", ans["text"])
+            txt = await self._ask(ws, ans["text"])
+            queue_history(self.session_key, "AI", txt)
 
     # ────────────────────────────────────────────
     # SCENE_SYNOPSIS 단계
     async def _scene_synopsis_loop(self, ws: WebSocket):
         prompt = build_scene_synopsis_prompt(SCENE_OK)
-        await append_history(self.session_key, "AI", prompt)
-        txt = await send_message(self.session_key, prompt)
-        await append_history(self.session_key, "AI", txt)
+        queue_history(self.session_key, "AI", prompt)
+        txt = await self._ask(ws, prompt)
+        queue_history(self.session_key, "AI", txt)
 
         while True:
             if WARNING in txt:
@@ -227,11 +252,12 @@ class StorybookService:
                 return
 
             if SCENE_OK in txt:
-                await append_history(self.session_key, "AI", STORY_5_LINES_PROMPT)
+                queue_history(self.session_key, "AI", STORY_5_LINES_PROMPT)
                 txt = await send_message(self.session_key, STORY_5_LINES_PROMPT)
-                refined_txt = send_clova_chat(txt)
-                await append_history(self.session_key, "AI", txt)
+                refined_txt = await refine_with_clova(txt)
+                queue_history(self.session_key, "AI", txt)
                 self.synopsis = refined_txt
+                await update_meta(self.session_key, synopsis=self.synopsis)
                 self.state = State.ILLUST_WAIT
                 return
 
@@ -239,27 +265,58 @@ class StorybookService:
             await ws.send_json({"type": "question", "text": q, "examples": ex})
 
             ans: ClientAnswer = await ws.receive_json()
-            await append_history(self.session_key, "U", ans["text"])
-            txt = await send_message(self.session_key, ans["text"])
-            await append_history(self.session_key, "AI", txt)
+            queue_history(self.session_key, "U", ans["text"])
+            txt = await self._ask(ws, ans["text"])
+            queue_history(self.session_key, "AI", txt)
 
     # ────────────────────────────────────────────
     # 일러스트 생성 대기
     async def _wait_for_images(self, ws: WebSocket):
-        while True:
-            if self.img_task and self.img_task.done():
-                self.urls = self.img_task.result()
-                await ws.send_json({"type": "illustration", "urls": self.urls})
-                self.state = State.CHOICE_WAIT
+        async def _progress(ready: int):
+            await ws.send_json({"type": "illustration_progress", "ready": ready, "total": IMAGES_PER_JOB})
+
+        job = None
+        if self.img_job:
+            job = await wait_for_job(self.img_job, settings.ILLUST_WAIT_TIMEOUT_SEC, _progress)
+
+        if job is not None and job["status"] in (QUEUED, RUNNING):
+            # 아직 만드는 중: 작업은 그대로 두고 더 기다릴지(wait) 처음부터 할지(retry) 묻는다
+            await ws.send_json({"type": "illustration_timeout", "job_id": self.img_job, "ready": job["ready"]})
+            cmd: ClientCmd = await ws.receive_json()
+            queue_history(self.session_key, "U", cmd.get("type", ""))
+            if cmd.get("type") == "wait":
+                return
+            if cmd.get("type") == "retry":
+                await self._drop_job()
                 return
-            await asyncio.sleep(0.3)
+            raise WebSocketException(code=1003)
+
+        if job is None or not job["urls"]:
+            error = job["error"] if job else "illustration job not found"
+            await ws.send_json({"type": "illustration_failed", "error": error})
+            await self._drop_job()
+            return
+
+        self.urls = job["urls"]
+        await ws.send_json({"type": "illustration", "urls": self.urls})
+        self.state = State.CHOICE_WAIT
+
+    async def _drop_job(self):
+        self.img_job = None
+        self.synopsis = ""
+        await update_meta(self.session_key, illust_job=None, synopsis=None)
+        self.state = State.ILLUST_INFO
 
     # ────────────────────────────────────────────
     # 사용자가 일러스트 선택
     async def _handle_choice(self, ws: WebSocket):
         choice: ClientChoice = await ws.receive_json()
-        await append_history(self.session_key, "U", choice["text"])
-        self.chosen_url = self.urls[choice["text"]]
+        queue_history(self.session_key, "U", str(choice.get("text", "")))
+        idx = choice.get("text")
+        if not isinstance(idx, int) or isinstance(idx, bool) or not 0 <= idx < len(self.urls):
+            await ws.send_json({"type": "invalid_choice", "count": len(self.urls)})
+            return
+        self.chosen_url = self.urls[idx]
         await ws.send_json({
             "type": "draft",
             "synopsis": self.synopsis,
@@ -271,31 +328,32 @@ class StorybookService:
     # 초안 검토
     async def _review_draft(self, ws: WebSocket):
         cmd: ClientCmd = await ws.receive_json()
-        await append_history(self.session_key, "U", cmd.get("type", ""))
+        queue_history(self.session_key, "U", cmd.get("type", ""))
         if cmd.get("type") == "accept":
-            scene_id = create_scene(
+            await create_scene(
                 ws.state.db,
                 self.session_key.split(":")[1],
                 self.synopsis,
                 self.chosen_url
             )
             await ws.send_json({"type": "final"})
-            await append_history(self.session_key, "AI", "final")
+            queue_history(self.session_key, "AI", "final")
             await mark_done(self.session_key)
             self.state = State.FINISHED
         elif cmd.get("type") == "retry":
-            self.state = State.ILLUST_INFO
+            await self._drop_job()
         else:
             raise WebSocketException(code=1003)
 
     # ────────────────────────────────────────────
     # QUIZ 단계
     async def _quiz_loop(self, ws: WebSocket):
-        title = get_story_by_story_id(ws.state.db, int(self.session_key.split(":")[1])).title
+        story = await get_story_by_story_id_async(ws.state.db, int(self.session_key.split(":")[1]))
+        title = story.title
         prompt = build_quiz_question_prompt(title)
-        await append_history(self.session_key, "AI", prompt)
-        txt = await send_message(self.session_key, prompt)
-        await append_history(self.session_key, "AI", txt)
+        queue_history(self.session_key, "AI", prompt)
+        txt = await self._ask(ws, prompt)
+        queue_history(self.session_key, "AI", txt)
 
         while True:
             q, ex = self._parse_q_examples(txt)
@@ -307,9 +365,30 @@ class StorybookService:
             await ws.send_json({"type": "feedback", "text": txt})
 
             next_prompt = "다음 문제를 이어서 내 줘."
-            txt = await send_message(self.session_key, next_prompt)
-            await append_history(self.session_key, "U", ans["text"])
-            await append_history(self.session_key, "AI", txt)
+            txt = await self._ask(ws, next_prompt)
+            queue_history(self.session_key, "U", ans["text"])
+            queue_history(self.session_key, "AI", txt)
+
+    # ────────────────────────────────────────────
+    # 모델 호출 (스트리밍 모드면 질문을 생성 중에 보내 준다)
+    async def _ask(self, ws: WebSocket, user_text: str) -> str:
+        # 이번 턴에 쌓인 history 를 한 번의 왕복으로 기록
+        await flush_history(self.session_key)
+        if not self.stream:
+            return await send_message(self.session_key, user_text)
+
+        txt = ""
+        last: Tuple[str, List[str]] | None = None
+        async for txt in stream_message(self.session_key, user_text):
+            # 마커 판정은 완성된 텍스트로 호출하는 쪽에서 한다.
+            # 마커가 보이면 질문이 아니므로 중간 프레임을 멈춘다.
+            if ILLUST_OK in txt or SCENE_OK in txt or WARNING in txt:
+                continue
+            partial = self._parse_q_examples(txt)
+            if partial[0] and partial != last:
+                await ws.send_json({"type": "question_partial", "text": partial[0], "examples": partial[1]})
+                last = partial
+        return txt
 
     # ────────────────────────────────────────────
     # QUESTION / EXAMPLES 파싱
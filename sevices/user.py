@@ -1,8 +1,16 @@
-from sqlalchemy.orm import Session
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
 import models
 
-def get_user_by_id(db: Session, user_id: int) -> models.User | None:
+async def get_user_by_id(db: AsyncSession, user_id: str) -> models.User | None:
     """
     주어진 ID로 사용자를 데이터베이스에서 찾아 반환합니다.
     """
-    return db.get(models.User, user_id)
\ No newline at end of file
+    # asyncpg 는 문자열을 UUID 컬럼에 자동 변환하지 않는다
+    try:
+        key = uuid.UUID(str(user_id))
+    except ValueError:
+        # UUID 형식이 아니면 그런 사용자는 없다
+        return None
+    return await db.get(models.User, key)
\ No newline at end of file
@@ -0,0 +1,371 @@
+"""
+스토리북 WebSocket 벤치마크.
+
+StorybookService.handle 을 가짜 제공자(FAKE_PROVIDERS) 위에서 N 개의 가상 클라이언트로 돌려
+ILLUST_INFO → SCENE_SYNOPSIS → ILLUST_WAIT → CHOICE_WAIT → DRAFT_REVIEW 흐름과 QUIZ 흐름의
+처리량, 상태별 지연 분위수, 세션당 Redis 왕복/명령 수, 세션당 메모리를 측정합니다.
+실제 Redis 가 필요하고, DB 는 메모리 스텁을 씁니다.
+
+    python -m tests.bench_storybook --clients 200 --quiz-clients 50 --out bench.json
+    python -m tests.bench_storybook --clients 200 --compare bench.json
+
+결과 JSON 에는 커밋 해시와 설정이 함께 남으므로 커밋끼리 비교할 수 있습니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+# 설정을 읽기 전에 가짜 제공자와 프로세스 내 삽화 생성을 강제한다
+os.environ["FAKE_PROVIDERS"] = "true"
+os.environ["ILLUST_WORKER_ENABLED"] = "false"
+
+from fastapi import WebSocketDisconnect  # noqa: E402
+from redis.asyncio.connection import Connection  # noqa: E402
+
+from core.chat_manager import new_session, chat_session_stats  # noqa: E402
+from core.config import get_settings  # noqa: E402
+from core.redis import rds, _meta, _hist  # noqa: E402
+from sevices.storywebsocket import StorybookService  # noqa: E402
+
+settings = get_settings()
+
+
+# ───── Redis 왕복 수 측정 ─────────────────────────────────────
+class RedisCounter:
+    """클라이언트 → Redis 전송 횟수(파이프라인은 1회)를 셉니다."""
+
+    def __init__(self):
+        self.round_trips = 0
+        self._original = Connection.send_packed_command
+
+    def install(self) -> None:
+        counter = self
+        original = self._original
+
+        async def _counting(conn, command, check_health=True):
+            counter.round_trips += 1
+            return await original(conn, command, check_health)
+
+        Connection.send_packed_command = _counting
+
+    def uninstall(self) -> None:
+        Connection.send_packed_command = self._original
+
+
+async def _server_commands() -> int:
+    info = await rds.info("stats")
+    return int(info.get("total_commands_processed", 0))
+
+
+# ───── 스텁 DB ───────────────────────────────────────────────
+class StubDB:
+    """create_scene / get_story_by_story_id_async / append_scene_search 가 쓰는 AsyncSession 메서드만 흉내 낸다"""
+
+    def __init__(self):
+        self.story = SimpleNamespace(id=1, title="숲속 토끼의 모험", original=True, user_id="bench")
+
+    async def get(self, model, id):
+        return self.story
+
+    def add(self, obj):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+    async def execute(self, statement, *args, **kwargs):
+        # 검색 문서 UPDATE 가 한 행을 바꾼 것처럼 (다시 만들기 경로는 타지 않는다)
+        return SimpleNamespace(rowcount=1)
+
+
+# ───── 가상 소켓 / 클라이언트 ─────────────────────────────────
+class BenchSocket:
+    """
+    서버(StorybookService)와 가상 클라이언트 사이의 메모리 소켓.
+    서버가 프레임을 보낼 때마다 (서버 상태, 직전 클라이언트 메시지 이후 경과 시간)을 기록한다.
+    """
+
+    def __init__(self, recorder: "Recorder"):
+        self.state = SimpleNamespace(db=StubDB())
+        self.service: Optional[StorybookService] = None
+        self.to_server: asyncio.Queue = asyncio.Queue()
+        self.to_client: asyncio.Queue = asyncio.Queue()
+        self.recorder = recorder
+        self.last_client_at = time.perf_counter()
+        self.first_partial_pending = False
+
+    async def accept(self, subprotocol: Optional[str] = None) -> None:
+        pass
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        elapsed = time.perf_counter() - self.last_client_at
+        state = self.service.state.name if self.service else "?"
+        if data.get("type") == "question_partial":
+            if self.first_partial_pending:
+                self.recorder.add(f"{state}:first_token", elapsed)
+                self.first_partial_pending = False
+        elif data.get("type") not in ("illustration_progress",):
+            self.recorder.add(state, elapsed)
+        self.to_client.put_nowait(data)
+
+    async def receive_json(self) -> Dict[str, Any]:
+        msg = await self.to_server.get()
+        if msg is None:
+            raise WebSocketDisconnect(code=1000)
+        self.last_client_at = time.perf_counter()
+        self.first_partial_pending = True
+        return msg
+
+    async def close(self, code: int = 1000) -> None:
+        self.to_client.put_nowait(None)
+
+    def reply(self, msg: Optional[Dict[str, Any]]) -> None:
+        self.to_server.put_nowait(msg)
+
+
+async def story_client(ws: BenchSocket, stream: bool, think: float) -> bool:
+    ws.reply({"type": "scene", "text": "숲속 토끼", "stream": stream})
+    while True:
+        frame = await ws.to_client.get()
+        if frame is None:
+            return False
+        kind = frame["type"]
+        if kind in ("question_partial", "illustration_progress"):
+            continue
+        if think:
+            await asyncio.sleep(think)
+        if kind == "question":
+            ws.reply({"type": "answer", "text": frame["examples"][0] if frame["examples"] else "좋아"})
+        elif kind == "illustration":
+            if not frame["urls"]:
+                ws.reply(None)
+                return False
+            ws.reply({"type": "choice", "text": 0})
+        elif kind == "draft":
+            ws.reply({"type": "accept"})
+        elif kind == "final":
+            return True
+        else:
+            ws.reply(None)
+            return False
+
+
+async def quiz_client(ws: BenchSocket, questions: int, stream: bool, think: float) -> bool:
+    ws.reply({"type": "quiz", "text": "", "stream": stream})
+    answered = 0
+    while True:
+        frame = await ws.to_client.get()
+        if frame is None:
+            return False
+        if frame["type"] != "question":
+            continue
+        if answered >= questions:
+            ws.reply(None)
+            return True
+        if think:
+            await asyncio.sleep(think)
+        ws.reply({"type": "answer", "text": frame["examples"][0] if frame["examples"] else "몰라"})
+        answered += 1
+
+
+# ───── 집계 ─────────────────────────────────────────────────
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def add(self, key: str, seconds: float) -> None:
+        self.samples[key].append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {key: _percentiles(values) for key, values in sorted(self.samples.items())}
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+
+    def _p(q: float) -> float:
+        idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return round(ordered[idx] * 1000, 2)
+
+    return {"count": len(ordered), "p50_ms": _p(0.50), "p90_ms": _p(0.90), "p99_ms": _p(0.99), "max_ms": _p(1.0)}
+
+
+async def _run_session(kind: str, args, recorder: Recorder, keys: List[str]) -> bool:
+    story_id = 1
+    key = await new_session("bench", story_id)
+    keys.append(key)
+    ws = BenchSocket(recorder)
+    service = StorybookService(key)
+    ws.service = service
+    if kind == "story":
+        client = story_client(ws, args.stream, args.think)
+    else:
+        client = quiz_client(ws, args.quiz_questions, args.stream, args.think)
+
+    server = asyncio.create_task(service.handle(ws))
+    client_task = asyncio.create_task(client)
+    # 서버가 먼저 죽으면 클라이언트는 오지 않을 프레임을 영원히 기다리므로 둘 다 본다
+    done, _ = await asyncio.wait({server, client_task}, return_when=asyncio.FIRST_EXCEPTION)
+    if server in done and not client_task.done():
+        client_task.cancel()
+        try:
+            await client_task
+        except asyncio.CancelledError:
+            pass
+        exc = server.exception()
+        if exc is not None and not isinstance(exc, WebSocketDisconnect):
+            raise exc
+        return False
+    try:
+        ok = await client_task
+    finally:
+        try:
+            await asyncio.wait_for(server, 30)
+        except (WebSocketDisconnect, asyncio.TimeoutError):
+            pass
+    return ok
+
+
+async def run(args) -> Dict[str, Any]:
+    recorder = Recorder()
+    counter = RedisCounter()
+    keys: List[str] = []
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    commands_before = await _server_commands()
+    counter.install()
+
+    kinds = ["story"] * args.clients + ["quiz"] * args.quiz_clients
+    started = time.perf_counter()
+
+    async def _delayed(i: int, kind: str) -> bool:
+        if args.ramp:
+            await asyncio.sleep(args.ramp * i / max(len(kinds), 1))
+        return await _run_session(kind, args, recorder, keys)
+
+    results = await asyncio.gather(*(_delayed(i, k) for i, k in enumerate(kinds)), return_exceptions=True)
+    wall = time.perf_counter() - started
+
+    counter.uninstall()
+    commands = await _server_commands() - commands_before
+    # mark_done 이 history 를 영구 보존하므로 벤치마크 세션은 지운다
+    if keys:
+        await rds.delete(*(k for key in keys for k in (_meta(key), _hist(key))))
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    traced_peak = 0
+    if args.trace_memory:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    sessions = len(kinds)
+    errors = [repr(r) for r in results if isinstance(r, BaseException)]
+    completed = sum(1 for r in results if r is True)
+    return {
+        "commit": _git_commit(),
+        "config": {
+            "clients": args.clients,
+            "quiz_clients": args.quiz_clients,
+            "quiz_questions": args.quiz_questions,
+            "stream": args.stream,
+            "think_sec": args.think,
+            "ramp_sec": args.ramp,
+            "fake_llm_latency_ms": settings.FAKE_LLM_LATENCY_MS,
+            "fake_image_latency_ms": settings.FAKE_IMAGE_LATENCY_MS,
+            "fake_error_rate": settings.FAKE_ERROR_RATE,
+        },
+        "wall_sec": round(wall, 3),
+        "sessions": sessions,
+        "completed": completed,
+        "errors": errors[:10],
+        "throughput_sessions_per_sec": round(completed / wall, 3) if wall else 0.0,
+        "latency": recorder.summary(),
+        "redis_round_trips_per_session": round(counter.round_trips / sessions, 2) if sessions else 0,
+        "redis_commands_per_session": round(commands / sessions, 2) if sessions else 0,
+        "rss_growth_kb_per_session": round((rss_after - rss_before) / sessions, 2) if sessions else 0,
+        "traced_peak_kb_per_session": round(traced_peak / 1024 / sessions, 2) if sessions and traced_peak else None,
+        "chat_sessions": chat_session_stats(),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ───── 출력 / 비교 ─────────────────────────────────────────────
+_SCALARS = [
+    "throughput_sessions_per_sec",
+    "redis_round_trips_per_session",
+    "redis_commands_per_session",
+    "rss_growth_kb_per_session",
+    "traced_peak_kb_per_session",
+]
+
+
+def _delta(new: Optional[float], old: Optional[float]) -> str:
+    if new is None or old is None:
+        return ""
+    if not old:
+        return f"({new - old:+.2f})"
+    return f"({(new - old) / old * 100:+.1f}%)"
+
+
+def report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    base_commit = f" vs {baseline['commit']}" if baseline else ""
+    print(f"commit {result['commit']}{base_commit}  sessions {result['completed']}/{result['sessions']}  wall {result['wall_sec']}s")
+    for key in _SCALARS:
+        old = baseline.get(key) if baseline else None
+        print(f"  {key:32} {result[key]!s:>10} {_delta(result[key], old)}")
+    print(f"  {'state':32} {'count':>6} {'p50':>9} {'p90':>9} {'p99':>9}")
+    for state, row in result["latency"].items():
+        old = (baseline or {}).get("latency", {}).get(state, {})
+        print(
+            f"  {state:32} {row['count']:>6} {row['p50_ms']:>9} {row['p90_ms']:>9} {row['p99_ms']:>9}"
+            f" {_delta(row['p99_ms'], old.get('p99_ms'))}"
+        )
+    if result["errors"]:
+        print("  errors:", *result["errors"], sep="\n    ")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="스토리북 WebSocket 벤치마크 (가짜 제공자 사용)")
+    parser.add_argument("--clients", type=int, default=50, help="동화 만들기 흐름 클라이언트 수")
+    parser.add_argument("--quiz-clients", type=int, default=10, help="퀴즈 흐름 클라이언트 수")
+    parser.add_argument("--quiz-questions", type=int, default=3, help="퀴즈 클라이언트당 답할 문제 수")
+    parser.add_argument("--stream", action="store_true", help="스트리밍 모드로 질문 받기")
+    parser.add_argument("--think", type=float, default=0.0, help="클라이언트 응답 전 대기(초)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="모든 클라이언트가 시작하기까지 걸리는 시간(초)")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc 으로 메모리 측정 (느려짐)")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(result, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    sys.exit(0 if not result["errors"] else 1)
+
+
+if __name__ == "__main__":
+    main()